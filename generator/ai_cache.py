@@ -0,0 +1,80 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+LOW_WATER = 0.9 # Eviction frees down to this share of max_bytes, so it runs once per ~10% of new entries
+
+
+
+class AIResponseCache:
+    """
+    Content-addressed, size-bounded cache of parsed AI issue lists.
+
+    One JSON file per entry; the file mtime doubles as the LRU timestamp so
+    the cache survives across runs without a separate index. Going over
+    max_bytes evicts least recently used entries down to LOW_WATER of it.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 100 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self._total_bytes = sum(entry.stat().st_size for entry in os.scandir(cache_dir) if entry.name.endswith('.json'))
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        hasher = hashlib.sha256()
+        for part in parts:
+            data = part.encode('utf-8')
+            # Length-prefix each part so ("ab", "c") and ("a", "bc") differ
+            hasher.update(str(len(data)).encode('ascii') + b':' + data)
+        return hasher.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                issues = json.load(f)
+            os.utime(path) # Mark as recently used
+        except (OSError, ValueError):
+            return None
+        return issues
+
+    def put(self, key: str, issues: List[Dict[str, Any]]):
+        path = self._path(key)
+        data = json.dumps(issues).encode('utf-8')
+        try:
+            previous = os.path.getsize(path)
+        except OSError:
+            previous = 0
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        self._total_bytes += len(data) - previous
+        if self._total_bytes > self.max_bytes:
+            self._evict(keep=path)
+
+    def _evict(self, keep: str):
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.json') and entry.path != keep:
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+
+        entries.sort() # Least recently used first
+        target = self.max_bytes * LOW_WATER
+        for _, size, path in entries:
+            if self._total_bytes <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self._total_bytes -= size
@@ -0,0 +1,198 @@
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List
+
+
+class RateLimitError(Exception):
+    """Raised by AIScanner when the API rejects a request for quota reasons (HTTP 429)."""
+
+
+class TokenBucket:
+    """
+    Async token bucket refilled continuously at rate_per_minute.
+
+    The effective rate can be lowered at runtime (see slow_down) and creeps
+    back up to the configured rate as requests succeed.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: float = None):
+        self.max_rate = rate_per_minute / 60.0
+        self.rate = self.max_rate
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        if now > self.paused_until:
+            start = max(self.updated, self.paused_until)
+            self.tokens = min(self.capacity, self.tokens + (now - start) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1):
+        # Oversized requests wait for a full bucket instead of blocking forever
+        amount = min(amount, self.capacity)
+        async with self._lock: # FIFO: later callers can't starve earlier ones
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+                wait += max(0.0, self.paused_until - time.monotonic())
+                await asyncio.sleep(wait)
+
+    def slow_down(self, pause: float):
+        # Multiplicative decrease on quota errors, plus a hard pause
+        self._refill()
+        self.rate = max(self.max_rate / 16, self.rate / 2)
+        self.paused_until = max(self.paused_until, time.monotonic() + pause)
+
+    def speed_up(self):
+        # Additive increase back towards the configured rate
+        self._refill()
+        self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+
+
+class AIPipeline:
+    """
+    Runs AIScanner requests concurrently on a background asyncio loop.
+
+    submit() returns immediately with a Future, so the filesystem scan keeps
+    going while requests are in flight. Requests are paced by a
+    requests-per-minute and a tokens-per-minute bucket; quota errors trigger
+    exponential backoff and temporarily lower the request rate.
+
+    With batch_tokens set, files that fit are packed into multi-file requests
+    of up to that many (estimated) tokens. A batch is sent when the next file
+    would overflow it, when it has max_batch_files files, batch_linger seconds
+    after its first file, or on flush().
+    """
+
+    def __init__(self, ai_scanner, requests_per_minute: float = 15, tokens_per_minute: float = 1_000_000,
+                 max_concurrency: int = 4, max_retries: int = 5, batch_tokens: int = 0,
+                 max_batch_files: int = 20, batch_linger: float = 2.0):
+        self.ai_scanner = ai_scanner
+        self.max_retries = max_retries
+        self.batch_tokens = batch_tokens
+        self.max_batch_files = max_batch_files
+        self.batch_linger = batch_linger
+        self._batch = [] # (file_path, content, reason, asyncio future); only touched on the loop
+        self._batch_chars = 0
+        self._batch_timer = None
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='ai-pipeline', daemon=True)
+        self._thread.start()
+
+        # Loop-bound primitives are created on the loop thread. No request burst:
+        # with one token of capacity, no 60 s window goes over requests_per_minute
+        async def setup():
+            self.requests = TokenBucket(requests_per_minute, capacity=1)
+            self.tokens = TokenBucket(tokens_per_minute)
+            self._semaphore = asyncio.Semaphore(max_concurrency)
+        asyncio.run_coroutine_threadsafe(setup(), self._loop).result()
+
+    def submit(self, file_path: str, content: str, reason: str = "") -> Future:
+        return asyncio.run_coroutine_threadsafe(self._analyze(file_path, content, reason), self._loop)
+
+    def flush(self):
+        """Sends the pending batch now instead of waiting for it to fill up."""
+        async def flush():
+            self._flush_batch()
+        asyncio.run_coroutine_threadsafe(flush(), self._loop).result()
+
+    async def _analyze(self, file_path: str, content: str, reason: str) -> List[Dict[str, Any]]:
+        cached = self.ai_scanner.cached_result(file_path, content, reason)
+        if cached is not None:
+            return cached
+
+        if self.batch_tokens and self.ai_scanner.estimate_batch_tokens(len(content), 1) <= self.batch_tokens:
+            return await self._add_to_batch(file_path, content, reason)
+        return await self._analyze_one(file_path, content, reason)
+
+    async def _analyze_one(self, file_path: str, content: str, reason: str) -> List[Dict[str, Any]]:
+        cost = self.ai_scanner.estimate_tokens(content)
+        issues = await self._request(cost, lambda: self.ai_scanner.analyze_file_async(file_path, content, reason))
+        if issues is None:
+            print(f"Giving up on {file_path}: rate limited {self.max_retries + 1} times")
+            return []
+        return issues
+
+    async def _request(self, cost: int, call):
+        # Paced, retried call(); None if every attempt was rate limited
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self.requests.acquire(1)
+                await self.tokens.acquire(cost)
+                try:
+                    result = await call()
+                except RateLimitError:
+                    delay = min(60.0, 2.0 * 2 ** attempt) * random.uniform(0.8, 1.2)
+                    self.requests.slow_down(delay)
+                    await asyncio.sleep(delay)
+                    continue
+                self.requests.speed_up()
+                return result
+        return None
+
+    def _add_to_batch(self, file_path: str, content: str, reason: str) -> asyncio.Future:
+        chars = self._batch_chars + len(content)
+        if self._batch and self.ai_scanner.estimate_batch_tokens(chars, len(self._batch) + 1) > self.batch_tokens:
+            self._flush_batch()
+        future = self._loop.create_future()
+        self._batch.append((file_path, content, reason, future))
+        self._batch_chars += len(content)
+        if len(self._batch) >= self.max_batch_files:
+            self._flush_batch()
+        elif self._batch_timer is None:
+            self._batch_timer = self._loop.call_later(self.batch_linger, self._flush_batch)
+        return future
+
+    def _flush_batch(self):
+        if self._batch_timer is not None:
+            self._batch_timer.cancel()
+            self._batch_timer = None
+        if self._batch:
+            batch, self._batch, self._batch_chars = self._batch, [], 0
+            self._loop.create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[tuple]):
+        try:
+            files = [(file_path, content, reason) for file_path, content, reason, _ in batch]
+            results = {}
+            if len(files) > 1:
+                cost = self.ai_scanner.estimate_batch_tokens(sum(len(content) for _, content, _ in files), len(files))
+                results = await self._request(cost, lambda: self.ai_scanner.analyze_batch_async(files)) or {}
+
+            # Files the batch didn't answer for (or a batch of one) go out on their own,
+            # unless they were cancelled in the meantime
+            leftovers = [item for item in batch if item[0] not in results and not item[3].done()]
+            retried = await asyncio.gather(*(self._analyze_one(file_path, content, reason)
+                                             for file_path, content, reason, _ in leftovers))
+            results.update((item[0], issues) for item, issues in zip(leftovers, retried))
+            for file_path, _, _, future in batch:
+                if not future.done():
+                    future.set_result(results[file_path])
+        except Exception as e:
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    def close(self):
+        # Cancelled or abandoned requests (e.g. past a time budget) are wound down before the loop stops
+        async def shutdown():
+            if self._batch_timer is not None:
+                self._batch_timer.cancel()
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
@@ -1,30 +1,146 @@
 import os
 import json
 import typing
-import google.generativeai as genai
-from typing import List, Dict, Any
+from functools import cached_property
+from typing import List, Dict, Any, Optional, Tuple
+from generator.ai_pipeline import RateLimitError
+
+MODEL_NAME = 'gemini-2.0-flash' # Use flash for speed/cost
+# Bump whenever _create_prompt or _create_batch_prompt changes so cached responses are not reused
+PROMPT_VERSION = 1
+# Fields every AI issue needs (the issue renderer and the tags use them)
+REQUIRED_ISSUE_FIELDS = ('title', 'description', 'suggestion', 'difficulty', 'type')
 
 class AIScanner:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, cache_dir: str = None, cache_max_bytes: int = 100 * 1024 * 1024):
         if not api_key:
             raise ValueError("API Key is required for AI Scanner")
         
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.0-flash') # Use flash for speed/cost
+        self.api_key = api_key
+        self.model_name = MODEL_NAME
+        self.cache = None
+        if cache_dir:
+            from generator.ai_cache import AIResponseCache
+            self.cache = AIResponseCache(cache_dir, cache_max_bytes)
+
+    @cached_property
+    def model(self):
+        # google.generativeai (grpc, protobuf, pydantic) takes over a second to
+        # import, so it waits for the first request: runs whose answers all
+        # come from the cache never load it
+        import google.generativeai as genai
+        genai.configure(api_key=self.api_key)
+        return genai.GenerativeModel(self.model_name)
 
     def analyze_file(self, file_path: str, content: str, reason: str = "") -> List[Dict[str, Any]]:
         """
         Sends file content to LLM to find issues.
         """
+        cached = self.cached_result(file_path, content, reason)
+        if cached is not None:
+            return cached
+
         prompt = self._create_prompt(file_path, content, reason)
         
         try:
             response = self.model.generate_content(prompt)
-            return self._parse_response(response.text, file_path)
         except Exception as e:
             print(f"Error analyzing {file_path}: {e}")
             return []
 
+        return self._handle_response(file_path, content, reason, response.text)
+
+    async def analyze_file_async(self, file_path: str, content: str, reason: str = "") -> List[Dict[str, Any]]:
+        """
+        Async variant of analyze_file. Raises RateLimitError on quota errors so
+        the caller can back off and retry; other errors yield no issues.
+        """
+        prompt = self._create_prompt(file_path, content, reason)
+
+        try:
+            response = await self.model.generate_content_async(prompt)
+        except Exception as e:
+            if self._is_rate_limit(e):
+                raise RateLimitError(str(e)) from e
+            print(f"Error analyzing {file_path}: {e}")
+            return []
+
+        return self._handle_response(file_path, content, reason, response.text)
+
+    async def analyze_batch_async(self, files: List[Tuple[str, str, str]]) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Analyzes several (file_path, content, reason) files with one request.
+        Returns issues per file path; files the answer leaves out (or a
+        response that can't be parsed) are missing from the result so the
+        caller can retry them one by one. Raises RateLimitError like
+        analyze_file_async.
+        """
+        prompt = self._create_batch_prompt(files)
+
+        try:
+            response = await self.model.generate_content_async(prompt)
+        except Exception as e:
+            if self._is_rate_limit(e):
+                raise RateLimitError(str(e)) from e
+            print(f"Error analyzing batch of {len(files)} files: {e}")
+            return {}
+
+        by_file = self._decode_issues(response.text)
+        if not isinstance(by_file, dict):
+            print(f"Failed to parse batched AI response for {len(files)} files")
+            return {}
+        results = {}
+        for file_path, content, reason in files:
+            issues = by_file.get(file_path)
+            if isinstance(issues, list):
+                results[file_path] = self._handle_issues(file_path, content, reason, issues)
+        return results
+
+    def estimate_tokens(self, content: str) -> int:
+        # ~4 characters per token, plus the fixed prompt around the content
+        return (len(content) + 2000) // 4
+
+    def estimate_batch_tokens(self, total_chars: int, files: int) -> int:
+        # One fixed prompt, plus a header per file
+        return (total_chars + 2000 + 200 * files) // 4
+
+    @staticmethod
+    def _is_rate_limit(error: Exception) -> bool:
+        # google.api_core raises ResourceExhausted for 429s; match by name and status
+        # code to avoid importing it, never by message text
+        if type(error).__name__ in ('ResourceExhausted', 'TooManyRequests'):
+            return True
+        return any(getattr(error, attr, None) == 429 for attr in ('code', 'status_code'))
+
+    def _handle_response(self, file_path: str, content: str, reason: str, response_text: str) -> List[Dict[str, Any]]:
+        issues = self._decode_issues(response_text)
+        if not isinstance(issues, list):
+            print(f"Failed to parse AI response for {file_path}")
+            return []
+        return self._handle_issues(file_path, content, reason, issues)
+
+    def _handle_issues(self, file_path: str, content: str, reason: str, issues: List[Any]) -> List[Dict[str, Any]]:
+        # Only well-formed issues are cached, so a bad answer can't break later runs.
+        # Batched and single answers share cache entries: both are keyed on content and reason
+        issues = self._valid_issues(issues, file_path)
+        if self.cache:
+            self.cache.put(self._cache_key(content, reason), issues)
+        return self._tag_issues(issues, file_path)
+
+    def cached_result(self, file_path: str, content: str, reason: str = "") -> Optional[List[Dict[str, Any]]]:
+        """
+        Returns the cached issue list for this exact content, or None on a miss.
+        """
+        if not self.cache:
+            return None
+        issues = self.cache.get(self._cache_key(content, reason))
+        if not isinstance(issues, list):
+            return None
+        return self._tag_issues(self._valid_issues(issues, file_path), file_path)
+
+    def _cache_key(self, content: str, reason: str) -> str:
+        return self.cache.make_key(self.model_name, str(PROMPT_VERSION), reason, content)
+
     def _create_prompt(self, file_path: str, content: str, reason: str = "") -> str:
         focus_area = "General Code Review"
         specific_instructions = ""
@@ -76,15 +192,71 @@ Code Content:
 ```
 """
 
-    def _parse_response(self, response_text: str, file_path: str) -> List[Dict[str, Any]]:
+    def _create_batch_prompt(self, files: List[Tuple[str, str, str]]) -> str:
+        sections = []
+        for file_path, content, reason in files:
+            sections.append(f"""=== FILE: {file_path} ===
+Reason for scan: {reason}
+```
+{content}
+```
+""")
+        body = "\n".join(sections)
+        return f"""
+You are an expert code reviewer. Analyze each of the following {len(files)} code files independently.
+Each file starts with a line `=== FILE: <path> ===`, followed by the reason it was flagged and its content.
+
+For files flagged with security_risk, FOCUS ON SECURITY VULNERABILITIES: SQL Injection, Command Injection,
+path traversal, hardcoded secrets, unsafe deserialization.
+For files flagged with high_complexity, FOCUS ON SIMPLIFICATION: how to break down large functions,
+reduce nesting, and improve readability.
+
+Find potential issues in these categories:
+1. **Potential Bugs**: Logic errors, edge cases, off-by-one errors.
+2. **Security Vulnerabilities**: Injection risks, unsafe inputs, poor data handling.
+3. **Code Quality**: Complex logic that needs refactoring, poor naming, duplication.
+
+Output STRICT JSON only: one JSON object keyed by file path (exactly as written after FILE:), whose values
+are lists of issues in this format:
+{{
+  "<file path>": [
+    {{
+      "title": "Short title of the issue",
+      "description": "Detailed description of the problem",
+      "suggestion": "How to fix it",
+      "line_number": <int> (approximate line number within that file, 0 if general),
+      "difficulty": "Easy" | "Medium" | "Hard",
+      "type": "bug" | "security" | "refactor"
+    }}
+  ]
+}}
+
+Include every file; use an empty list [] for files without significant issues.
+
+{body}"""
+
+    def _decode_issues(self, response_text: str) -> Optional[List[Dict[str, Any]]]:
         cleaned_text = response_text.replace('```json', '').replace('```', '').strip()
         try:
-            issues = json.loads(cleaned_text)
-            # Add file path to each issue
-            for issue in issues:
-                issue['file'] = file_path
-                issue['tags'] = ['ai-generated', issue['type']]
-            return issues
+            return json.loads(cleaned_text)
         except json.JSONDecodeError:
-            print(f"Failed to parse AI response for {file_path}")
-            return []
+            return None
+
+    @staticmethod
+    def _valid_issues(issues: List[Any], file_path: str) -> List[Dict[str, Any]]:
+        # Drops items that aren't objects with every REQUIRED_ISSUE_FIELDS (as text)
+        valid = [issue for issue in issues if isinstance(issue, dict) and
+                 all(isinstance(issue.get(field), str) for field in REQUIRED_ISSUE_FIELDS)]
+        if len(valid) < len(issues):
+            print(f"Dropped {len(issues) - len(valid)} malformed AI issues for {file_path}")
+        return valid
+
+    def _tag_issues(self, issues: List[Dict[str, Any]], file_path: str) -> List[Dict[str, Any]]:
+        # Add file path to each issue (copies, so cached lists are never mutated)
+        tagged = []
+        for issue in issues:
+            issue = dict(issue)
+            issue['file'] = file_path
+            issue['tags'] = ['ai-generated', issue['type']]
+            tagged.append(issue)
+        return tagged
@@ -0,0 +1,297 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from generator.engine import LineEngine, LINE_DETECTORS
+from generator.lexer import Spans, language_for
+from generator.scanner import Scanner
+
+# Per-language comment marker, function template and docstring (None: no docstrings)
+LANGUAGES = {
+    'py': ('#', 'def {name}(x):', '    """Docstring."""'),
+    'js': ('//', 'function {name}(x) {{', None),
+    'ts': ('//', 'export function {name}(x: number) {{', None),
+    'java': ('//', 'public int {name}(int x) {{', None),
+    'c': ('//', 'int {name}(int x) {{', None),
+}
+# Startup budget: a non-AI CLI run over a one-file tree, interpreter start included
+STARTUP_BUDGET_MS = 100
+STARTUP_RUNS = 10
+# Must not be imported by a plain (non-AI, serial, walk) scan; see --startup
+DEFERRED_MODULES = ('google.generativeai', 'asyncio', 'sqlite3', 'multiprocessing', 'concurrent.futures.process',
+                    'subprocess', 'ast', 'importlib.metadata', 'dotenv')
+WORDS = ['value', 'result', 'index', 'count', 'buffer', 'config', 'request', 'handler', 'item', 'total']
+
+
+def generate_repo(root: str, files: int = 1000, lines: int = 200, line_length: int = 60, line_length_stddev: int = 25,
+                  todo_density: float = 0.01, secret_density: float = 0.001, languages: Dict[str, float] = None,
+                  seed: int = 0) -> Dict[str, int]:
+    """
+    Writes a synthetic source tree under root and returns its size stats.
+    Densities are per line; lines per file vary +-50% around the mean.
+    """
+    rng = random.Random(seed)
+    languages = languages or {'py': 0.6, 'js': 0.3, 'java': 0.1}
+    exts = list(languages)
+    weights = [languages[ext] for ext in exts]
+    total_bytes = 0
+    total_lines = 0
+
+    for i in range(files):
+        ext = rng.choices(exts, weights)[0]
+        comment, func_template, docstring = LANGUAGES[ext]
+        # Spread files over a shallow tree, with a tests/ folder like real repos
+        folder = os.path.join(root, 'tests' if i % 10 == 0 else f"pkg{i % 17}", f"mod{i % 5}")
+        os.makedirs(folder, exist_ok=True)
+        name = f"test_file{i}" if i % 10 == 0 else f"file{i}"
+
+        out = []
+        indent = 0
+        for n in range(max(1, int(lines * rng.uniform(0.5, 1.5)))):
+            roll = rng.random()
+            if roll < todo_density:
+                out.append(f"{' ' * indent}{comment} TODO: {rng.choice(['cleanup', 'fix', 'refactor'])} {rng.choice(WORDS)}")
+            elif roll < todo_density + secret_density:
+                out.append(f"{' ' * indent}password = \"s3cr3t{n}\"")
+            elif roll < todo_density + secret_density + 0.05:
+                out.append(func_template.format(name=f"{rng.choice(WORDS)}_{n}"))
+                indent = 4
+                if docstring and rng.random() < 0.5:
+                    out.append(docstring)
+            elif roll < todo_density + secret_density + 0.06:
+                out.append('')
+            else:
+                indent = min(32, max(0, indent + rng.choice([-4, 0, 0, 0, 4])))
+                length = max(8, int(rng.gauss(line_length, line_length_stddev)))
+                words = []
+                while sum(len(w) + 1 for w in words) < length:
+                    words.append(rng.choice(WORDS))
+                out.append(' ' * indent + ' '.join(words))
+
+        data = "\n".join(out) + "\n"
+        with open(os.path.join(folder, f"{name}.{ext}"), 'w', encoding='utf-8') as f:
+            f.write(data)
+        total_bytes += len(data.encode('utf-8'))
+        total_lines += len(out)
+
+    return {'files': files, 'bytes': total_bytes, 'lines': total_lines}
+
+
+def _source_texts(root: str) -> List[Any]:
+    texts = []
+    for dirpath, _, files in os.walk(root):
+        for file in files:
+            with open(os.path.join(dirpath, file), 'r', encoding='utf-8') as f:
+                text = f.read()
+            texts.append((text, text.count('\n'), file.endswith('.py'), language_for(file)))
+    return texts
+
+
+def time_detectors(root: str) -> Dict[str, float]:
+    """
+    Seconds spent by each line detector alone over the (pre-read) corpus,
+    lexing included, plus the file read, the complexity line count and a
+    full lex of every file.
+    """
+    timings = {}
+    start = time.perf_counter()
+    texts = _source_texts(root)
+    timings['read'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for text, _, _, _ in texts:
+        text.count('\n')
+    timings['complexity'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for text, _, _, language in texts:
+        if language:
+            Spans(text, language).spans()
+    timings['lex'] = time.perf_counter() - start
+
+    for detector in LINE_DETECTORS:
+        engine = LineEngine([detector])
+        start = time.perf_counter()
+        for text, line_count, python, language in texts:
+            engine.run_text(text, line_count, python, Spans(text, language) if language else None)
+        timings[detector] = time.perf_counter() - start
+
+    engine = LineEngine()
+    start = time.perf_counter()
+    for text, line_count, python, language in texts:
+        engine.run_text(text, line_count, python, Spans(text, language) if language else None)
+    timings['all_line_detectors'] = time.perf_counter() - start
+    return timings
+
+
+def run_benchmark(root: str, stats: Dict[str, int], jobs: int = 1, repeat: int = 3, docs_ast: bool = False) -> Dict[str, Any]:
+    best = None
+    counts = {}
+    for _ in range(repeat):
+        scanner = Scanner(root, jobs=jobs, keep_findings=False, docs_ast=docs_ast)
+        start = time.perf_counter()
+        scanner.scan()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+        counts = dict(scanner.counts)
+
+    return {
+        'scan_seconds': best,
+        'files_per_sec': stats['files'] / best,
+        'mb_per_sec': stats['bytes'] / best / (1024 * 1024),
+        'detector_seconds': time_detectors(root),
+        'findings': counts,
+    }
+
+
+def _run_python(args: List[str], env: Dict[str, str]) -> (float, str):
+    # -> (wall seconds, stderr) of a child interpreter started in the repo root
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, *args], cwd=cwd, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{proc.stderr}")
+    return elapsed, proc.stderr
+
+
+def _parse_importtime(stderr: str) -> List[Any]:
+    # 'import time: self [us] | cumulative | imported package' lines -> [(name, self_us, cumulative_us)]
+    imports = []
+    for line in stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            self_us, cumulative_us, name = (part.strip() for part in line[len('import time:'):].split('|'))
+            if self_us.isdigit():
+                imports.append((name, int(self_us), int(cumulative_us)))
+    return imports
+
+
+def run_startup_benchmark(root: str, runs: int = STARTUP_RUNS) -> Dict[str, Any]:
+    """
+    Times the CLI end to end on the (small) tree at root, against a bare
+    interpreter start, and lists what it imports via -X importtime.
+    """
+    # Measured with bytecode cached, like an installed package
+    env = {k: v for k, v in os.environ.items() if k != 'PYTHONDONTWRITEBYTECODE'}
+    output_dir = tempfile.mkdtemp(prefix='gitissue-startup-')
+    cli = ['-m', 'generator.main', '--path', root, '--output', output_dir]
+    try:
+        _run_python(cli, env) # Warm-up: writes .pyc files, fills the OS cache
+        baseline = [_run_python(['-c', 'pass'], env)[0] for _ in range(runs)]
+        timings = [_run_python(cli, env)[0] for _ in range(runs)]
+        _, stderr = _run_python(['-X', 'importtime', *cli], env)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    imports = _parse_importtime(stderr)
+    loaded = {name for name, _, _ in imports}
+    median_ms = statistics.median(timings) * 1000
+    return {
+        'interpreter_ms': min(baseline) * 1000,
+        'cli_best_ms': min(timings) * 1000,
+        'cli_median_ms': median_ms,
+        'budget_ms': STARTUP_BUDGET_MS,
+        'within_budget': median_ms <= STARTUP_BUDGET_MS,
+        'import_ms': sum(self_us for _, self_us, _ in imports) / 1000,
+        'slowest_imports': sorted(imports, key=lambda imp: -imp[1])[:10],
+        'deferred_but_loaded': [name for name in DEFERRED_MODULES if name in loaded],
+    }
+
+
+def _parse_languages(value: str) -> Dict[str, float]:
+    languages = {}
+    for part in value.split(','):
+        ext, _, weight = part.partition('=')
+        if ext not in LANGUAGES:
+            raise argparse.ArgumentTypeError(f"unknown language '{ext}' (choose from {', '.join(LANGUAGES)})")
+        languages[ext] = float(weight or 1)
+    return languages
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description='Benchmark the scanner on a synthetic repository')
+    parser.add_argument('--files', type=int, default=1000, help='Number of files to generate')
+    parser.add_argument('--lines', type=int, default=200, help='Mean lines per file')
+    parser.add_argument('--line-length', type=int, default=60, help='Mean line length in characters')
+    parser.add_argument('--line-length-stddev', type=int, default=25, help='Line length standard deviation')
+    parser.add_argument('--todo-density', type=float, default=0.01, help='Fraction of lines that are TODO comments')
+    parser.add_argument('--secret-density', type=float, default=0.001, help='Fraction of lines with hardcoded secrets')
+    parser.add_argument('--languages', type=_parse_languages, default='py=0.6,js=0.3,java=0.1',
+                        help=f"Language mix as ext=weight pairs ({', '.join(LANGUAGES)})")
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the generated repository')
+    parser.add_argument('--jobs', '-j', type=int, default=1, help='Scanner worker processes')
+    parser.add_argument('--docs-ast', action='store_true', help='Benchmark the AST docstring detector')
+    parser.add_argument('--repeat', type=int, default=3, help='Scan this many times and keep the best')
+    parser.add_argument('--keep', type=str, default=None, help='Generate into this directory and keep it')
+    parser.add_argument('--json', type=str, default=None, help="Write results as JSON to this file ('-' for stdout)")
+    parser.add_argument('--startup', action='store_true',
+                        help=f'Benchmark CLI startup on a one-file tree instead (exits 1 over {STARTUP_BUDGET_MS}ms '
+                             'or if a deferred module gets imported)')
+    args = parser.parse_args(argv)
+
+    root = args.keep or tempfile.mkdtemp(prefix='gitissue-bench-')
+    try:
+        if args.startup:
+            stats = generate_repo(root, 1, args.lines, args.line_length, args.line_length_stddev,
+                                  args.todo_density, args.secret_density, {'py': 1}, args.seed)
+            results = run_startup_benchmark(root)
+        else:
+            stats = generate_repo(root, args.files, args.lines, args.line_length, args.line_length_stddev,
+                                  args.todo_density, args.secret_density, args.languages, args.seed)
+            results = run_benchmark(root, stats, jobs=args.jobs, repeat=args.repeat, docs_ast=args.docs_ast)
+    finally:
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+    config = {k: v for k, v in vars(args).items() if k not in ('json', 'keep')}
+    if args.startup:
+        config = {'startup': True, 'lines': args.lines, 'runs': STARTUP_RUNS}
+    output = {'config': config, 'corpus': stats, 'python': platform.python_version(), **results}
+
+    if args.json == '-':
+        json.dump(output, sys.stdout, indent=2)
+        print()
+    elif args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(output, f, indent=2)
+
+    if args.startup:
+        if args.json != '-':
+            _print_startup(results)
+        if not results['within_budget'] or results['deferred_but_loaded']:
+            sys.exit(1)
+        return
+    if args.json == '-':
+        return
+
+    print(f"Corpus: {stats['files']} files, {stats['lines']} lines, {stats['bytes'] / (1024 * 1024):.1f} MB")
+    print(f"Scan:   {results['scan_seconds']:.3f}s  {results['files_per_sec']:.0f} files/s  {results['mb_per_sec']:.2f} MB/s")
+    print("Detectors (seconds, each run alone):")
+    for name, seconds in results['detector_seconds'].items():
+        print(f"  {name:<20} {seconds:.4f}")
+
+
+def _print_startup(results: Dict[str, Any]):
+    verdict = 'OK' if results['within_budget'] else 'OVER BUDGET'
+    print(f"Interpreter start: {results['interpreter_ms']:.1f}ms")
+    print(f"CLI on one file:   {results['cli_median_ms']:.1f}ms median, {results['cli_best_ms']:.1f}ms best "
+          f"(budget {results['budget_ms']}ms: {verdict})")
+    print(f"Imports:           {results['import_ms']:.1f}ms in total, slowest (self time):")
+    for name, self_us, cumulative_us in results['slowest_imports']:
+        print(f"  {name:<40} {self_us / 1000:6.2f}ms  ({cumulative_us / 1000:.2f}ms with dependencies)")
+    loaded = results['deferred_but_loaded']
+    print(f"Deferred modules:  {'none imported' if not loaded else 'IMPORTED: ' + ', '.join(loaded)}")
+
+
+if __name__ == '__main__':
+    main()
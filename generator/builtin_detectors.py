@@ -0,0 +1,107 @@
+from typing import Any, Dict, List
+
+from generator.engine import LineEngine, LineHits
+from generator.parsed_file import ParsedFile
+from generator.rules import BEGINNER_KEYWORDS, SECURITY_PATTERNS, MAX_FILE_LINES
+
+# Per-file detectors registered in generator.detectors. Each takes the file's
+# ParsedFile and LineHits and returns its findings for one report key.
+
+_docs_engine = None # The 'docs' rule on its own, for check_docs_ast's fallback
+
+
+def find_todos(parsed: ParsedFile, hits: LineHits) -> List[Dict[str, Any]]:
+    todos = []
+    for line_number, content in hits.todos:
+        is_beginner = any(k in content.lower() for k in BEGINNER_KEYWORDS)
+        todos.append({
+            'file': parsed.path,
+            'line': line_number,
+            'scope': parsed.enclosing_scope(line_number),
+            'content': content,
+            'difficulty': 'Easy' if is_beginner else 'Unknown',
+            'tags': ['good first issue'] if is_beginner else []
+        })
+    return todos
+
+
+def check_complexity(parsed: ParsedFile, hits: LineHits) -> List[Dict[str, Any]]:
+    if hits.line_count > MAX_FILE_LINES:
+        return [{
+            'file': parsed.path,
+            'lines': hits.line_count,
+            'reason': 'File too long (> 300 lines)',
+            'difficulty': 'Hard',
+            'tags': ['refactor']
+        }]
+    return []
+
+
+def check_nesting_depth(parsed: ParsedFile, hits: LineHits) -> List[Dict[str, Any]]:
+    # Deep nesting = any code line indented more than MAX_INDENT (see LineEngine)
+    if hits.deep_nesting:
+        return [{
+            'file': parsed.path,
+            'lines': hits.line_count, # Approx
+            'reason': 'Deep nesting detected',
+            'difficulty': 'Hard',
+            'tags': ['refactor', 'complexity']
+        }]
+    return []
+
+
+def check_security_patterns(parsed: ParsedFile, hits: LineHits) -> List[Dict[str, Any]]:
+    security_issues = []
+    for name in hits.security:
+        security_issues.append({
+            'file': parsed.path,
+            'issue': f"Potential security risk: {name}",
+            'pattern': SECURITY_PATTERNS[name],
+            'difficulty': 'Medium',
+            'tags': ['security', 'security-audit']
+        })
+    return security_issues
+
+
+def check_docs(parsed: ParsedFile, hits: LineHits) -> List[Dict[str, Any]]:
+    # Very simple regex-based check for missing docstrings in python functions (see LineEngine)
+    undocumented = []
+    for line_number, func_name in hits.undocumented:
+        undocumented.append({
+            'file': parsed.path,
+            'line': line_number,
+            'function': func_name,
+            'difficulty': 'Easy',
+            'tags': ['good first issue', 'documentation']
+        })
+    return undocumented
+
+
+def check_docs_ast(parsed: ParsedFile, hits: LineHits) -> List[Dict[str, Any]]:
+    # Functions, methods and classes from the parsed AST; files that don't
+    # parse (or are too big to decode whole) get the regex check instead
+    tree = None
+    if parsed.buffer is None and ('def ' in parsed.text or 'class ' in parsed.text):
+        tree = parsed.tree
+    if tree is None:
+        return check_docs(parsed, _docs_hits(parsed))
+    from generator.docstrings import undocumented_symbols
+    return [{
+        'file': parsed.path,
+        'line': line_number,
+        'function': name,
+        'symbol': symbol,
+        'scope': scope,
+        'difficulty': 'Easy',
+        'tags': ['good first issue', 'documentation']
+    } for line_number, name, symbol, scope in undocumented_symbols(tree)]
+
+
+def _docs_hits(parsed: ParsedFile) -> LineHits:
+    # The regex pass behind check_docs, only run for files without an AST
+    global _docs_engine
+    if _docs_engine is None:
+        _docs_engine = LineEngine(['docs'])
+    if parsed.buffer is not None:
+        return _docs_engine.run_buffer(parsed.buffer, True, parsed.spans)
+    return _docs_engine.run_text(parsed.text, parsed.line_count, True, parsed.spans)
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, Optional
+
+
+def file_digest(file_path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+class ScanCache:
+    """
+    On-disk cache of per-file scan results, keyed by path and validated by
+    size + mtime (and optionally a content hash).
+
+    The whole cache is tagged with a rules version; if the detectors change,
+    every entry is discarded on load.
+    """
+
+    def __init__(self, cache_path: str, rules_version: str, verify_content: bool = False):
+        self.cache_path = cache_path
+        self.rules_version = rules_version
+        self.verify_content = verify_content
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._seen = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return # Missing or corrupt cache: start cold
+
+        if data.get('rules_version') == self.rules_version:
+            self._entries = data.get('entries', {})
+
+    def lookup(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached result for file_path, or None if it has to be rescanned.
+        """
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+
+        key = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+        entry = self._entries.get(file_path)
+        stat_matches = entry is not None and entry['size'] == key['size'] and entry['mtime_ns'] == key['mtime_ns']
+
+        if self.verify_content:
+            try:
+                key['sha256'] = file_digest(file_path)
+            except OSError:
+                return None
+            # Content hash is authoritative: a touched-but-identical file is still a hit
+            valid = entry is not None and entry.get('sha256') == key['sha256']
+        else:
+            valid = stat_matches
+
+        self._seen[file_path] = key
+        if not valid:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        entry.update(key)
+        return entry['result']
+
+    def store(self, file_path: str, result: Dict[str, Any]):
+        key = self._seen.get(file_path)
+        if key is None:
+            return # Never stat'ed (or vanished) - nothing to validate against later
+        self._entries[file_path] = dict(key, result=result)
+
+    def save(self, prune: bool = True):
+        # Pruning keeps only files seen in this run so deleted files don't
+        # accumulate; partial runs (a subset of files) keep everything
+        if prune:
+            entries = {path: self._entries[path] for path in self._seen if path in self._entries}
+        else:
+            entries = self._entries
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'rules_version': self.rules_version, 'entries': entries}, f)
+        os.replace(tmp_path, self.cache_path)
@@ -0,0 +1,72 @@
+import re
+from typing import Any, Dict, List, Tuple
+
+# Lines where a new function/class starts (Python, JS/TS, Java, C-family); preferred cut points
+_BOUNDARY = re.compile(
+    r'\s*(?:@\w|(?:async\s+)?def\s|class\s|(?:export\s+)?(?:default\s+)?(?:async\s+)?function\b|'
+    r'(?:public|private|protected|static|interface|enum|struct)\s)'
+)
+
+
+class Chunk:
+    def __init__(self, start_line: int, end_line: int, content: str):
+        self.start_line = start_line # 1-based, inclusive
+        self.end_line = end_line
+        self.content = content
+
+
+def chunk_lines(lines: List[str], max_chars: int, overlap_lines: int = 20) -> List[Chunk]:
+    """
+    Splits a file into windows of at most max_chars (a single longer line
+    still gets a window of its own). Windows end right before a def/class
+    line when there is one in their second half, and each window repeats the
+    last overlap_lines lines of the previous one so code near a cut is seen
+    whole at least once.
+    """
+    chunks = []
+    start = 0
+    n = len(lines)
+    while start < n:
+        size = 0
+        end = start
+        while end < n and (end == start or size + len(lines[end]) + 1 <= max_chars):
+            size += len(lines[end]) + 1
+            end += 1
+
+        if end < n:
+            # Back up to the last boundary in the second half of the window, if any
+            for cut in range(end - 1, start + (end - start) // 2, -1):
+                if _BOUNDARY.match(lines[cut]) and not _BOUNDARY.match(lines[cut - 1]):
+                    end = cut
+                    break
+
+        chunks.append(Chunk(start + 1, end, "\n".join(lines[start:end])))
+        if end >= n:
+            break
+        start = max(start + 1, end - overlap_lines)
+    return chunks
+
+
+def merge_chunk_issues(file_path: str, parts: List[Tuple[Chunk, List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+    """
+    Combines per-chunk AI issues into one list for the file: line numbers are
+    shifted from chunk-relative to file lines, and issues reported twice (by
+    overlapping windows) are kept once.
+    """
+    if len(parts) == 1:
+        return parts[0][1] # Whole file in one window: nothing to shift or overlap
+
+    merged = []
+    seen = set()
+    for chunk, issues in parts:
+        for issue in issues:
+            issue = dict(issue, file=file_path)
+            line = issue.get('line_number')
+            if isinstance(line, int) and line > 0:
+                issue['line_number'] = min(line, chunk.end_line - chunk.start_line + 1) + chunk.start_line - 1
+            key = (str(issue.get('title', '')).strip().lower(), issue.get('line_number'))
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(issue)
+    return merged
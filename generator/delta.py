@@ -0,0 +1,141 @@
+import heapq
+import json
+import os
+import re
+import tempfile
+from typing import Iterator, Tuple
+
+from generator.fingerprint import fingerprint
+
+DIFF_SORT_CHUNK = 100_000 # JSONL lines sorted in memory at a time; longer reports spill to temp files
+
+_SQLITE_MAGIC = b'SQLite format 3\x00'
+# The two keys the join needs, picked out without parsing the whole line. Quotes
+# inside JSON strings are escaped, so these can only match the real keys.
+_FINGERPRINT_KEY = re.compile(r'"fingerprint": "([0-9a-f]+)"')
+_KIND_KEY = re.compile(r'"kind": "(\w+)"')
+
+
+def is_store(path: str) -> bool:
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(_SQLITE_MAGIC)) == _SQLITE_MAGIC
+    except OSError:
+        return False
+
+
+def read_sorted(spec: str) -> Iterator[Tuple[str, str, str]]:
+    """
+    Findings of one report as (fingerprint, kind, JSON text), in fingerprint
+    order. spec is a JSONL report (--jsonl) or a findings database (--store)
+    as PATH for its latest run, PATH:previous for the run before that, or
+    PATH:<run id>.
+    """
+    path, _, run = spec.rpartition(':')
+    if path and is_store(path) and not is_store(spec):
+        return _read_store(path, run)
+    if is_store(spec):
+        return _read_store(spec, 'latest')
+    return _read_jsonl(spec)
+
+
+def _read_store(path: str, run: str):
+    import sqlite3
+    from generator.store import connect, latest_run
+    try:
+        conn = connect(path, readonly=True)
+    except sqlite3.DatabaseError as e:
+        raise ValueError(f"{path}: not a findings database ({e})")
+    try:
+        if run in ('latest', 'previous'):
+            run_id = latest_run(conn)
+            if run == 'previous' and run_id is not None:
+                run_id = latest_run(conn, before=run_id)
+            if run_id is None:
+                raise ValueError(f"{path} has no {run} run")
+        else:
+            try:
+                run_id = int(run)
+            except ValueError:
+                raise ValueError(f"{path}: bad run {run!r} (expected a run id, 'latest' or 'previous')")
+            if conn.execute('SELECT 1 FROM runs WHERE id = ?', (run_id,)).fetchone() is None:
+                raise ValueError(f"{path} has no run {run_id}")
+        # Served from the (fingerprint, run) index or sorted by SQLite, which spills to disk itself
+        rows = conn.execute('SELECT fingerprint, kind, data FROM findings WHERE run_id = ? ORDER BY fingerprint', (run_id,))
+        yield from rows
+    except sqlite3.DatabaseError as e:
+        raise ValueError(f"{path}: {e}")
+    finally:
+        conn.close()
+
+
+def _read_jsonl(path: str):
+    # External sort: sorted runs of DIFF_SORT_CHUNK lines go to temp files,
+    # then a k-way merge streams them back
+    with open(path, 'r', encoding='utf-8') as f, tempfile.TemporaryDirectory(prefix='generator-diff-') as tmp_dir:
+        runs = []
+        chunk = []
+        for line in f:
+            if not line.strip():
+                continue
+            fp = _FINGERPRINT_KEY.search(line)
+            kind = _KIND_KEY.search(line)
+            if fp and kind:
+                fp, kind = fp.group(1), kind.group(1)
+            else:
+                item = json.loads(line)
+                kind = item.pop('kind')
+                # Reports from before fingerprints existed get one computed (without ordinals)
+                fp = item.get('fingerprint') or fingerprint(kind, item)
+            chunk.append((fp, kind, line.rstrip('\n')))
+            if len(chunk) >= DIFF_SORT_CHUNK:
+                runs.append(_spill(chunk, tmp_dir, len(runs)))
+                chunk = []
+        chunk.sort()
+        if not runs:
+            yield from chunk
+            return
+        runs.append(_spill(chunk, tmp_dir, len(runs)))
+        files = [open(run_path, 'r', encoding='utf-8') for run_path in runs]
+        try:
+            rows = (tuple(line.rstrip('\n').split('\t', 2)) for line in heapq.merge(*files))
+            yield from rows
+        finally:
+            for run_file in files:
+                run_file.close()
+
+
+def _spill(chunk, tmp_dir: str, index: int) -> str:
+    chunk.sort()
+    run_path = os.path.join(tmp_dir, f"run{index}.tsv")
+    with open(run_path, 'w', encoding='utf-8') as f:
+        # JSON text never contains a raw tab or newline, so these split back cleanly
+        f.writelines(f"{fp}\t{kind}\t{data}\n" for fp, kind, data in chunk)
+    return run_path
+
+
+def diff_reports(old: Iterator[Tuple[str, str, str]], new: Iterator[Tuple[str, str, str]]):
+    """
+    Merge join of two fingerprint-ordered reports (see read_sorted). Yields
+    ('new' | 'resolved' | 'unchanged', (fingerprint, kind, JSON text));
+    unchanged findings come from the new report.
+    """
+    old_row = next(old, None)
+    new_row = next(new, None)
+    while old_row is not None or new_row is not None:
+        if new_row is None or (old_row is not None and old_row[0] < new_row[0]):
+            yield 'resolved', old_row
+            old_row = next(old, None)
+        elif old_row is None or new_row[0] < old_row[0]:
+            yield 'new', new_row
+            new_row = next(new, None)
+        else:
+            yield 'unchanged', new_row
+            old_row = next(old, None)
+            new_row = next(new, None)
+
+
+def finding(row: Tuple[str, str, str]) -> dict:
+    # The finding dict of a row, as JsonlSink writes it (with 'kind')
+    fp, kind, data = row
+    return dict(json.loads(data), kind=kind, fingerprint=fp)
@@ -0,0 +1,203 @@
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+import sys
+from typing import Any, Callable, Dict, List, Sequence
+
+from generator.engine import LINE_DETECTORS
+from generator.rules import SOURCE_EXTENSIONS
+
+ENTRY_POINT_GROUP = 'first_issue_generator.detectors'
+
+# Report keys a per-file detector may produce (the others come from the walk and the AI)
+DETECTOR_KINDS = ('todos', 'complex_files', 'undocumented_functions', 'security_issues')
+
+_loaded = {} # target -> callable, per process
+
+
+class DetectorSpec:
+    """
+    Declares a per-file detector without importing it. target is
+    'module:function'; the function is called as function(parsed, hits) with
+    the file's ParsedFile and LineHits and returns a list of findings for
+    the report key kind. extensions limits it to some file types (single
+    suffixes such as '.py') and line_rules lists the LineEngine rules it
+    needs in hits (see LINE_DETECTORS).
+
+    The module is only imported when the first matching file is analyzed.
+    """
+
+    def __init__(self, name: str, target: str, kind: str, extensions: Sequence[str] = SOURCE_EXTENSIONS,
+                 line_rules: Sequence[str] = (), enabled: bool = True):
+        if ':' not in target:
+            raise ValueError(f"detector {name}: target must be 'module:function', got {target!r}")
+        if kind not in DETECTOR_KINDS:
+            raise ValueError(f"detector {name}: kind must be one of {', '.join(DETECTOR_KINDS)}, got {kind!r}")
+        unknown = set(line_rules) - set(LINE_DETECTORS)
+        if unknown:
+            raise ValueError(f"detector {name}: unknown line rules {sorted(unknown)}")
+        # Scanner matches detectors to files by os.path.splitext, so only a real extension works
+        bad = [ext for ext in extensions if len(ext) < 2 or os.path.splitext('x' + ext)[1] != ext]
+        if bad:
+            raise ValueError(f"detector {name}: extensions must be single suffixes like '.py', got {bad}")
+        self.name = name
+        self.target = target
+        self.kind = kind
+        self.extensions = tuple(extensions)
+        self.line_rules = tuple(line_rules)
+        self.enabled = enabled
+
+    def applies_to(self, file_path: str) -> bool:
+        return file_path.endswith(self.extensions)
+
+    def load(self) -> Callable:
+        detector = _loaded.get(self.target)
+        if detector is None:
+            detector = _resolve(self.target)
+            _loaded[self.target] = detector
+        return detector
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'name': self.name, 'target': self.target, 'kind': self.kind, 'extensions': list(self.extensions),
+                'line_rules': list(self.line_rules), 'enabled': self.enabled}
+
+
+def builtin_detectors() -> List[DetectorSpec]:
+    # In report order within each file; 'docs_ast' is the opt-in alternative to 'docs'
+    module = 'generator.builtin_detectors'
+    return [
+        DetectorSpec('todos', f'{module}:find_todos', 'todos', line_rules=('todo',)),
+        DetectorSpec('complexity', f'{module}:check_complexity', 'complex_files'),
+        DetectorSpec('nesting', f'{module}:check_nesting_depth', 'complex_files', line_rules=('nesting',)),
+        DetectorSpec('security', f'{module}:check_security_patterns', 'security_issues', line_rules=('security',)),
+        DetectorSpec('docs', f'{module}:check_docs', 'undocumented_functions', extensions=('.py',), line_rules=('docs',)),
+        DetectorSpec('docs_ast', f'{module}:check_docs_ast', 'undocumented_functions', extensions=('.py',), enabled=False),
+    ]
+
+
+class DetectorRegistry:
+    """
+    The detectors known to a run: the built-ins, then any registered through
+    the ENTRY_POINT_GROUP entry points or a JSON config file. A detector
+    registered under an existing name replaces it.
+    """
+
+    def __init__(self, specs: Sequence[DetectorSpec] = None):
+        self.specs = {}
+        for spec in builtin_detectors() if specs is None else specs:
+            self.register(spec)
+
+    def register(self, spec: DetectorSpec):
+        self.specs[spec.name] = spec
+
+    def load_entry_points(self):
+        # Each entry point names a DetectorSpec (or a list of them): a cheap
+        # declaration, whose target is still imported lazily
+        for value in entry_point_values(ENTRY_POINT_GROUP):
+            declared = _resolve(value)
+            for spec in declared if isinstance(declared, (list, tuple)) else [declared]:
+                self.register(spec)
+
+    def load_config(self, path: str):
+        """
+        Reads detector declarations from a JSON file:
+        {"detectors": [{"name": ..., "target": "module:function", "kind": ...,
+        "extensions": [...], "line_rules": [...], "enabled": true}]}
+        An entry with only a name and "enabled" switches an existing detector.
+        """
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        for entry in config.get('detectors', []):
+            if 'target' not in entry and entry.get('name') in self.specs:
+                self.specs[entry['name']].enabled = entry.get('enabled', True)
+            else:
+                self.register(DetectorSpec(**entry))
+
+    def select(self, enable: Sequence[str] = (), disable: Sequence[str] = ()) -> List[DetectorSpec]:
+        # The detectors to run, after per-run overrides of their enabled flags.
+        # Their modules must exist, but are still only imported when first used
+        unknown = (set(enable) | set(disable)) - set(self.specs)
+        if unknown:
+            raise ValueError(f"unknown detectors: {', '.join(sorted(unknown))} (known: {', '.join(self.specs)})")
+        selected = [spec for name, spec in self.specs.items()
+                    if name not in disable and (spec.enabled or name in enable)]
+        for spec in selected:
+            if not _module_exists(spec.target.partition(':')[0].strip()):
+                raise ValueError(f"detector {spec.name}: no module for target {spec.target!r}")
+        return selected
+
+
+def entry_point_values(group: str) -> List[str]:
+    """
+    'module:attr' values of the entry points in group, read straight from
+    the entry_points.txt of every distribution on sys.path. importlib.metadata
+    does the same but costs ~35ms to import, a third of the startup budget.
+    A distribution installed twice counts once, the first on sys.path.
+    """
+    values = []
+    seen = set()
+    header = f"[{group}]"
+    for base in sys.path:
+        try:
+            entries = list(os.scandir(base or '.'))
+        except OSError:
+            continue
+        for entry in entries:
+            if not entry.name.endswith(('.dist-info', '.egg-info')):
+                continue
+            dist = entry.name.partition('-')[0].lower().replace('_', '-')
+            if dist in seen:
+                continue
+            seen.add(dist)
+            try:
+                with open(os.path.join(entry.path, 'entry_points.txt'), 'r', encoding='utf-8') as f:
+                    text = f.read()
+            except OSError:
+                continue
+            if header in text:
+                values.extend(_section_values(text, header))
+    return values
+
+
+def _section_values(text: str, header: str) -> List[str]:
+    values = []
+    in_section = False
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith('['):
+            in_section = line == header
+        elif in_section and '=' in line and not line.startswith(('#', ';')):
+            values.append(line.partition('=')[2].partition('[')[0].strip()) # Drop '[extras]'
+    return values
+
+
+def _module_exists(name: str) -> bool:
+    # find_spec imports a dotted name's parent packages, never the module itself
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def _resolve(value: str):
+    module_name, _, attr = value.partition(':')
+    target = importlib.import_module(module_name.strip())
+    for part in attr.strip().split('.') if attr.strip() else []:
+        target = getattr(target, part)
+    return target
+
+
+def select_detectors(docs_ast: bool = False) -> List[DetectorSpec]:
+    # The built-ins as run by default (docs_ast swaps the regex docstring check for the AST one)
+    registry = DetectorRegistry()
+    if docs_ast:
+        return registry.select(enable=['docs_ast'], disable=['docs'])
+    return registry.select()
+
+
+def detectors_version(specs: Sequence[DetectorSpec]) -> str:
+    # Part of the scan cache version: a different detector set means different results
+    key = [(spec.name, spec.target, spec.kind, spec.extensions, spec.line_rules) for spec in specs]
+    return hashlib.sha256(json.dumps(key).encode('utf-8')).hexdigest()[:8]
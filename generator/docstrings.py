@@ -0,0 +1,43 @@
+import ast
+from typing import List, Optional, Tuple
+
+_DEFS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+_BLOCKS = (ast.stmt, ast.excepthandler) + ((ast.match_case,) if hasattr(ast, 'match_case') else ())
+
+
+def parse_python(text: str, file_path: str = '<unknown>') -> Optional[ast.Module]:
+    # None if the file doesn't parse (Python 2, syntax errors, null bytes); callers fall back to regexes
+    try:
+        return ast.parse(text, file_path)
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        return None
+
+
+def undocumented_symbols(tree: ast.Module) -> List[Tuple[int, str, str, str]]:
+    """
+    Public functions, methods and classes without a docstring, as
+    (line, name, symbol, scope) with symbol one of 'function', 'method',
+    'class' and scope the dotted name of the enclosing classes ('' at module
+    level). Names starting with '_' and anything defined inside a function
+    are skipped.
+    """
+    found = []
+    _visit(tree.body, '', found)
+    found.sort()
+    return found
+
+
+def _visit(nodes, scope: str, found: list):
+    for node in nodes:
+        if isinstance(node, _DEFS):
+            if node.name.startswith('_'):
+                continue
+            is_class = isinstance(node, ast.ClassDef)
+            if ast.get_docstring(node, clean=False) is None:
+                symbol = 'class' if is_class else 'method' if scope else 'function'
+                found.append((node.lineno, node.name, symbol, scope))
+            if is_class:
+                _visit(node.body, f"{scope}.{node.name}" if scope else node.name, found)
+        elif isinstance(node, _BLOCKS):
+            # Defs under if/try/with/... still belong to the enclosing module or class
+            _visit(ast.iter_child_nodes(node), scope, found)
@@ -0,0 +1,238 @@
+import re
+from typing import List, Optional, Sequence
+
+from generator.lexer import Spans
+from generator.rules import TODO_PATTERN, SECURITY_PATTERNS, RULE_ANCHORS, RULE_SPANS, MAX_INDENT
+
+LINE_DETECTORS = ('todo', 'docs', 'nesting', 'security')
+
+# Structural rules handled directly by the engine. They start at the newline
+# before a line (the haystack gets a leading '\n' for line 1) so that every
+# alternative begins with a literal and re can skip ahead quickly.
+_DEF_LINE = r'\n[^\S\n]*def '
+_DEEP_INDENT = r'\n[^\S\n]{%d,}(?=[^\s#])' % (MAX_INDENT + 1)
+
+# Buffers are scanned in newline-aligned windows of about this size, so
+# lowercasing never copies more than one window at a time
+WINDOW_BYTES = 8 * 1024 * 1024
+
+# Block comment and docstring ends, cut from TODOs that close on their own line
+_CLOSERS = {True: ('*/', '"""', "'''"), False: (b'*/', b'"""', b"'''")}
+
+
+class LineHits:
+    """Raw per-file results of one LineEngine pass, before they become report findings."""
+
+    def __init__(self, line_count: int):
+        self.line_count = line_count
+        self.todos = [] # (line number, content)
+        self.undocumented = [] # (line number, function name)
+        self.deep_nesting = False
+        self.security = [] # Pattern names, in SECURITY_PATTERNS order
+
+    def merge(self, other: 'LineHits'):
+        # Combine the hits of engines that ran disjoint detectors over the same file
+        self.todos.extend(other.todos)
+        self.undocumented.extend(other.undocumented)
+        self.deep_nesting = self.deep_nesting or other.deep_nesting
+        found = set(self.security) | set(other.security)
+        self.security = [name for name in SECURITY_PATTERNS if name in found]
+
+
+class _Flavour:
+    # Compiled rules for one haystack type (str or bytes)
+
+    def __init__(self, rules: List[str], python_rules: List[str], line_rules, as_bytes: bool):
+        def compile_(pattern, flags=0):
+            return re.compile(pattern.encode('utf-8') if as_bytes else pattern, flags)
+
+        def combined(rules, flags=0):
+            return compile_('|'.join(rules), flags) if rules else None
+
+        self.newline = b'\n' if as_bytes else '\n'
+        self.def_token = b'def ' if as_bytes else 'def '
+        self.doc_quotes = (b'"""', b"'''") if as_bytes else ('"""', "'''")
+        self.non_blank = compile_(r'\S')
+        self.combined = {False: combined(rules), True: combined(python_rules)}
+        # For text whose length changes when lowercased (bytes.lower() never does)
+        self.combined_nocase = {False: combined(rules, re.IGNORECASE), True: combined(python_rules, re.IGNORECASE)}
+        self.line_rules = [(name, compile_(pattern.pattern, re.IGNORECASE)) for name, pattern in line_rules]
+
+
+class LineEngine:
+    """
+    Runs every line-level detector in a single pass over a file.
+
+    All rules are compiled once into one alternation: the structural rules
+    (def line, deep indent) plus the literal anchors of every regex rule (see
+    RULE_ANCHORS). That combined pattern is the only thing run over the whole
+    file, case-sensitively against the lowercased text, which keeps re on its
+    fast literal path; its branches are left unnamed because capture groups
+    roughly double the matching cost. Each match is dispatched on its text:
+    an anchor hit re-checks the full rules against just that line, so
+    overlapping matches (a TODO and an eval() on one line) are still found and
+    every rule keeps line-level semantics.
+
+    Input is either decoded text (run_text) or a raw UTF-8 buffer such as an
+    mmap (run_buffer); on buffers only the matched lines are ever decoded.
+    Given the file's lexer Spans, a rule match only counts in the spans
+    RULE_SPANS allows it (TODOs in comments, eval() in code); spans are only
+    consulted for matches, so the file is lexed no further than its last hit.
+    """
+
+    def __init__(self, detectors: Sequence[str] = LINE_DETECTORS):
+        self.detectors = frozenset(detectors)
+        line_rules = []
+        if 'todo' in self.detectors:
+            line_rules.append(('todo', TODO_PATTERN))
+        if 'security' in self.detectors:
+            for name, pattern in SECURITY_PATTERNS.items():
+                line_rules.append((name, re.compile(pattern, re.IGNORECASE)))
+
+        rules = []
+        if 'nesting' in self.detectors:
+            rules.append(_DEEP_INDENT)
+        rules.extend(sorted({re.escape(anchor) for name, _ in line_rules for anchor in RULE_ANCHORS[name]}))
+        python_rules = rules
+        if 'docs' in self.detectors:
+            python_rules = [_DEF_LINE] + rules # Before _DEEP_INDENT: def lines are dispatched as defs
+
+        self._text = _Flavour(rules, python_rules, line_rules, as_bytes=False)
+        self._bytes = _Flavour(rules, python_rules, line_rules, as_bytes=True)
+
+    def run_text(self, text: str, line_count: int, python: bool = False, spans: Spans = None) -> LineHits:
+        hits = LineHits(line_count)
+        self._scan(self._text, text, text, 0, 1, python, hits, set(), spans)
+        return hits
+
+    def run_buffer(self, buffer, python: bool = False, spans: Spans = None) -> LineHits:
+        """
+        Scans a UTF-8 encoded buffer (bytes or mmap) without decoding it as a
+        whole; spans, if given, must be lexed from the same buffer. Raises
+        UnicodeDecodeError if the buffer is not valid UTF-8.
+        """
+        size = len(buffer)
+        hits = LineHits(0)
+        found_security = set()
+        line_number = 1
+        start = 0
+        while start < size:
+            end = buffer.rfind(b'\n', start, start + WINDOW_BYTES) if start + WINDOW_BYTES < size else size
+            if end == -1:
+                end = buffer.find(b'\n', start + WINDOW_BYTES) # One very long line
+                if end == -1:
+                    end = size
+            window = buffer[start:end]
+            # Windows end at a newline byte, which never falls inside a UTF-8
+            # sequence, so validating window by window is exact
+            str(window, 'utf-8')
+            self._scan(self._bytes, window, buffer, start, line_number, python, hits, found_security, spans)
+            line_number += window.count(b'\n') + (end < size) # Plus the newline between windows
+            start = end + 1
+
+        # Like iterating a text file: a trailing newline doesn't start another line
+        hits.line_count = line_number - 1
+        if size and buffer[size - 1:size] != b'\n':
+            hits.line_count += 1
+        return hits
+
+    def _scan(self, flavour: _Flavour, window, source, base: int, line_number: int, python: bool, hits: LineHits,
+              found_security: set, spans: Optional[Spans]):
+        # window: whole lines of source starting at offset base; source is used
+        # to look past the window for docstrings and is what spans was lexed from
+        combined = flavour.combined[python]
+        if combined is None:
+            return
+
+        newline = flavour.newline
+        lowered = window.lower()
+        if len(lowered) == len(window):
+            haystack = newline + lowered
+        else:
+            # A few characters change length when lowercased; offsets must line up
+            haystack = newline + window
+            combined = flavour.combined_nocase[python]
+
+        # Offsets into haystack are one ahead of offsets into window
+        counted = 0
+        pos = 0
+        while True:
+            match = combined.search(haystack, pos)
+            if match is None:
+                break
+            token = match.group()
+
+            if token[:1] == newline:
+                line_start = match.start() # == window offset of the line after this newline
+                line_number += window.count(newline, counted, line_start)
+                counted = line_start
+                pos = match.end() # Keep looking for anchors on the same line
+                if not token.endswith(flavour.def_token):
+                    hits.deep_nesting = True
+                    continue
+
+                line_end = window.find(newline, line_start)
+                if line_end == -1:
+                    line_end = len(window)
+                line = _decode(window[line_start:line_end])
+                stripped = line.lstrip()
+                if not stripped.startswith('def '): # The lowercased text also matches 'DEF '
+                    continue
+                if 'nesting' in self.detectors and len(line) - len(stripped) > MAX_INDENT:
+                    hits.deep_nesting = True # The deep indent branch never sees def lines
+                func_name = line.split('def ')[1].split('(')[0]
+                if not func_name.startswith('_'): # Skip private functions
+                    # Documented if the next non-blank line opens a docstring
+                    next_code = flavour.non_blank.search(source, base + line_end)
+                    if next_code is None or source[next_code.start():next_code.start() + 3] not in flavour.doc_quotes:
+                        hits.undocumented.append((line_number, func_name))
+                continue
+
+            # Anchor hit: evaluate every line rule on this line once
+            start = match.start() - 1
+            line_number += window.count(newline, counted, start)
+            counted = start
+            line_start = window.rfind(newline, 0, start) + 1
+            line_end = window.find(newline, start)
+            if line_end == -1:
+                line_end = len(window)
+            line = window[line_start:line_end]
+            for name, pattern in flavour.line_rules:
+                if name == 'todo':
+                    todo, end = _search(pattern, line, base + line_start, spans, RULE_SPANS[name], group=2)
+                    if todo:
+                        content = todo.group(3)
+                        if end is not None and end <= base + line_end: # A block comment or docstring closes on this line
+                            content = _strip_closer(content[:end - base - line_start - todo.start(3)])
+                        hits.todos.append((line_number, _decode(content).strip()))
+                elif name not in found_security and _search(pattern, line, base + line_start, spans, RULE_SPANS[name])[0]:
+                    found_security.add(name)
+            pos = line_end + 1 # haystack offset of this line's newline; the next line starts right after
+
+        hits.security = [name for name in SECURITY_PATTERNS if name in found_security]
+
+
+def _search(pattern, line, offset: int, spans: Optional[Spans], kinds, group: int = 0):
+    # First match of pattern in line (at offset in the file) that starts in
+    # one of the span kinds, and the end of its span (None if it's code)
+    match = pattern.search(line)
+    while match:
+        if spans is None:
+            return match, None
+        kind, end = spans.span_at(offset + match.start(group))
+        if kind in kinds:
+            return match, end
+        match = pattern.search(line, match.start(group) + 1) # Not finditer: a match can swallow the next one
+    return None, None
+
+
+def _strip_closer(content):
+    content = content.rstrip()
+    for closer in _CLOSERS[isinstance(content, str)]:
+        if content.endswith(closer):
+            return content[:-len(closer)]
+    return content
+
+
+def _decode(value) -> str:
+    return value if isinstance(value, str) else value.decode('utf-8')
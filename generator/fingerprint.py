@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, Optional
+
+# Bump when the fingerprint inputs change: every issue file gets a new name
+FINGERPRINT_VERSION = 1
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _normalize(text: Any) -> str:
+    return _WHITESPACE.sub(' ', str(text)).strip().lower()
+
+
+# Report key -> what identifies the finding within its file. Line numbers are
+# deliberately left out so unrelated edits above a finding don't rename it.
+_CONTENT = {
+    'todos': lambda item: _normalize(item['content']),
+    'missing_tests': lambda item: '',
+    'complex_files': lambda item: item['reason'],
+    'undocumented_functions': lambda item: item['function'],
+    'security_issues': lambda item: item['issue'],
+    'ai_issues': lambda item: f"{_normalize(item.get('type', ''))}:{_normalize(item.get('title', ''))}",
+}
+
+
+def relative_path(file_path: str, root_path: str = None) -> str:
+    # '/'-separated and relative to the scan root, so checkouts in different places agree
+    if root_path:
+        prefix = os.path.join(root_path, '')
+        file_path = file_path[len(prefix):] if file_path.startswith(prefix) else os.path.relpath(file_path, root_path)
+    if os.sep != '/':
+        file_path = file_path.replace(os.sep, '/')
+    return file_path
+
+
+def fingerprint(kind: str, item: Dict[str, Any], root_path: str = None, ordinal: int = 0) -> str:
+    """
+    Stable id of a finding: detector, file (relative to root_path), normalized
+    content and enclosing scope. ordinal tells apart identical findings in the
+    same scope (the second identical TODO in a function is ordinal 1).
+    """
+    key = [FINGERPRINT_VERSION, kind, relative_path(item['file'], root_path),
+           _CONTENT[kind](item), item.get('scope', '')]
+    if ordinal:
+        key.append(ordinal)
+    return hashlib.sha256(json.dumps(key).encode('utf-8')).hexdigest()[:16]
+
+
+class FingerprintIndex:
+    """
+    Hands out fingerprints for the findings of one run and drops repeats: a
+    finding identical to one already seen (same fingerprint and line) gets
+    None. Otherwise identical findings are numbered in the order they arrive.
+
+    Findings arrive grouped by file and identical ones always share a file,
+    so only the current file's state is kept: memory stays flat however many
+    findings a streamed run has.
+    """
+
+    def __init__(self, root_path: str = None):
+        self.root_path = root_path
+        self.duplicates = 0
+        self._file = None
+        self._counts = Counter()
+        self._seen = set()
+
+    def assign(self, kind: str, item: Dict[str, Any]) -> Optional[str]:
+        if item['file'] != self._file:
+            self._file = item['file']
+            self._counts.clear()
+            self._seen.clear()
+        base = fingerprint(kind, item, self.root_path)
+        line = item.get('line', item.get('line_number'))
+        if (base, line) in self._seen:
+            self.duplicates += 1
+            return None
+        self._seen.add((base, line))
+        ordinal = self._counts[base]
+        self._counts[base] += 1
+        return fingerprint(kind, item, self.root_path, ordinal) if ordinal else base
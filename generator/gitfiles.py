@@ -0,0 +1,70 @@
+import os
+from collections import Counter
+from typing import Dict, List
+
+
+class GitError(Exception):
+    pass
+
+
+def _git(root_path: str, *args: str) -> List[str]:
+    # NUL-separated output so odd file names survive; paths come back '/'-separated
+    import subprocess # Not needed (nor paid for at startup) unless git is used
+    try:
+        proc = subprocess.run(['git', '-C', root_path, *args], capture_output=True, check=False)
+    except OSError as e:
+        raise GitError(f"could not run git: {e}")
+    if proc.returncode != 0:
+        message = proc.stderr.decode('utf-8', errors='replace').strip()
+        raise GitError(message or f"git {args[0]} failed with exit code {proc.returncode}")
+    return [name for name in proc.stdout.decode('utf-8', errors='surrogateescape').split('\0') if name]
+
+
+def _require_work_tree(root_path: str):
+    # Outside a repo some commands ('git diff') silently fall back to non-git behaviour
+    _git(root_path, 'rev-parse', '--is-inside-work-tree')
+
+
+def _path(root_path: str, name: str) -> str:
+    # git names are '/'-separated and relative to root_path
+    if os.sep != '/':
+        name = name.replace('/', os.sep)
+    return os.path.join(root_path, name)
+
+
+def _join(root_path: str, names) -> List[str]:
+    return [_path(root_path, name) for name in sorted(set(names))]
+
+
+def tracked_files(root_path: str) -> List[str]:
+    """
+    Files under root_path in the git index, without looking at the working
+    tree: untracked files (build output, scratch files) are never listed, and
+    entries deleted from the working tree are still there (readers skip them).
+    Raises GitError outside a repo.
+    """
+    return _join(root_path, _git(root_path, 'ls-files', '-z', '--cached'))
+
+
+def changed_files(root_path: str, ref: str) -> List[str]:
+    """
+    Files under root_path that differ from ref in the working tree (committed,
+    staged or not), plus untracked files that aren't gitignored. Deleted files
+    are left out. Paths are joined onto root_path, sorted.
+    """
+    _require_work_tree(root_path)
+    # '--' keeps a ref that happens to match a file name from being read as a path
+    changed = _git(root_path, 'diff', '--name-only', '-z', '--relative', '--diff-filter=d', ref, '--')
+    untracked = _git(root_path, 'ls-files', '-z', '--others', '--exclude-standard')
+    return _join(root_path, changed + untracked)
+
+
+def churn_counts(root_path: str, max_commits: int = 1000) -> Dict[str, int]:
+    """
+    How many of the last max_commits commits touched each file under
+    root_path, keyed like the paths returned above.
+    """
+    names = _git(root_path, 'log', f'-n{max_commits}', '--format=', '--name-only', '-z', '--relative')
+    counts = Counter(name.strip('\n') for name in names) # Commits are separated by an extra newline
+    counts.pop('', None)
+    return {_path(root_path, name): count for name, count in counts.items()}
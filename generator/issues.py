@@ -0,0 +1,305 @@
+import heapq
+import os
+from typing import Iterator
+
+from generator.fingerprint import fingerprint
+
+MAX_PENDING_WRITES = 1024 # Bounds memory when findings are streamed in
+PRUNE_SORT_CHUNK = 100_000 # File names sorted in memory at a time when pruning; more spill to temp files
+
+
+def generate_issue_files(report, output_dir, prune=True):
+    """
+    Writes one markdown issue template per finding in report to output_dir.
+    Returns the IssueWriter, for its counts.
+    """
+    writer = IssueWriter(output_dir, prune=prune)
+    success = False
+    try:
+        for kind in REPORT_KINDS:
+            for item in report.get(kind, []):
+                writer.write(kind, item)
+        success = True
+    finally:
+        writer.close(success)
+    return writer
+
+
+def render_issue(kind, item):
+    # -> (file name, markdown content) for one finding
+    type_prefix, render = RENDERERS[kind]
+    title, body = render(item)
+
+    # Named by the finding's fingerprint, so a rerun rewrites the same file
+    # even after the code around it moved
+    file_hash = item.get('fingerprint') or fingerprint(kind, item)
+    filename = f"issue_{type_prefix}_{file_hash}.md"
+
+    # Add labels section for GitHub Action to parse if needed
+    labels = ', '.join(item.get('tags', []))
+    content = f"""---
+title: "{title}"
+labels: {labels}
+fingerprint: {file_hash}
+---
+{body}
+"""
+    return filename, content
+
+
+class IssueWriter:
+    """
+    Writes issue files through a thread pool. A file that already holds the
+    same content is left alone (so its mtime and any artifact diff stay
+    clean), and with prune=True, issue_*.md files that this run didn't
+    produce are removed on close(), unless the run failed part way.
+
+    Repeats are only looked for within the current file, since findings
+    arrive grouped by file; the names to keep when pruning are held in
+    sorted runs spilled to disk, so memory stays flat on streamed runs.
+    """
+
+    def __init__(self, output_dir, workers=8, prune=True):
+        from concurrent.futures import ThreadPoolExecutor
+        self.output_dir = output_dir
+        self.prune = prune
+        os.makedirs(output_dir, exist_ok=True)
+        self.written = 0
+        self.unchanged = 0
+        self.removed = 0
+        self._file = None
+        self._file_names = set() # Written for the current file
+        self._names = _NameSpool() if prune else None
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='issue-writer')
+        self._pending = set()
+
+    def write(self, kind, item):
+        filename, content = render_issue(kind, item)
+        if item['file'] != self._file:
+            self._file = item['file']
+            self._file_names.clear()
+        if filename in self._file_names:
+            return # Same finding (and content) already written this run
+        self._file_names.add(filename)
+        if self._names is not None:
+            self._names.add(filename)
+        if len(self._pending) >= MAX_PENDING_WRITES:
+            from concurrent.futures import wait, FIRST_COMPLETED
+            done, self._pending = wait(self._pending, return_when=FIRST_COMPLETED)
+            self._count(done)
+        self._pending.add(self._pool.submit(self._write_file, os.path.join(self.output_dir, filename), content))
+
+    @staticmethod
+    def _write_file(filepath, content):
+        # Runs on a pool thread; True if the file was (re)written
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                if f.read() == content:
+                    return False
+        except (OSError, UnicodeDecodeError):
+            pass # Missing or unreadable: write it
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return True
+
+    def _count(self, futures):
+        for future in futures:
+            if future.result():
+                self.written += 1
+            else:
+                self.unchanged += 1
+
+    def close(self, success=True):
+        # After a failed or interrupted run the files this run didn't get to
+        # are not stale: queued writes are dropped and nothing is pruned
+        try:
+            if success:
+                self._count(self._pending)
+        finally:
+            self._pending = set()
+            self._pool.shutdown(cancel_futures=not success)
+        try:
+            if self.prune and success:
+                self._prune()
+        finally:
+            if self._names is not None:
+                self._names.close()
+
+    def _prune(self):
+        # Merge join of the sorted directory listing against the sorted names written
+        existing = _NameSpool()
+        written = self._names.sorted()
+        try:
+            with os.scandir(self.output_dir) as entries:
+                for entry in entries:
+                    if entry.name.startswith('issue_') and entry.name.endswith('.md'):
+                        existing.add(entry.name)
+            current = next(written, None)
+            for name in existing.sorted():
+                while current is not None and current < name:
+                    current = next(written, None)
+                if name != current:
+                    os.remove(os.path.join(self.output_dir, name))
+                    self.removed += 1
+        finally:
+            written.close()
+            existing.close()
+
+
+class _NameSpool:
+    # A bag of file names that hands them back sorted: sorted runs of
+    # PRUNE_SORT_CHUNK names go to temp files, then a k-way merge streams them
+
+    def __init__(self):
+        self._chunk = []
+        self._runs = []
+        self._tmp_dir = None
+
+    def add(self, name):
+        self._chunk.append(name)
+        if len(self._chunk) >= PRUNE_SORT_CHUNK:
+            self._spill()
+
+    def _spill(self):
+        if self._tmp_dir is None:
+            import tempfile
+            self._tmp_dir = tempfile.TemporaryDirectory(prefix='generator-issues-')
+        path = os.path.join(self._tmp_dir.name, f"{len(self._runs)}.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.writelines(f"{name}\n" for name in sorted(self._chunk))
+        self._runs.append(path)
+        self._chunk = []
+
+    def sorted(self) -> Iterator[str]:
+        files = [open(path, 'r', encoding='utf-8') for path in self._runs]
+        try:
+            yield from heapq.merge(sorted(self._chunk), *((line[:-1] for line in f) for f in files))
+        finally:
+            for f in files:
+                f.close()
+
+    def close(self):
+        if self._tmp_dir is not None:
+            self._tmp_dir.cleanup()
+            self._tmp_dir = None
+
+
+def _render_todo(item):
+    title = f"TODO: {item['content'][:50]}..."
+    body = f"""
+# {title}
+
+**File**: `{item['file']}:{item['line']}`
+**Difficulty**: {item['difficulty']}
+
+## Description
+Found a TODO comment which might need addressing:
+```python
+{item['content']}
+```
+
+## detailed context
+This TODO was identifying during an automated scan of the codebase.
+"""
+    return title, body
+
+
+def _render_missing_test(item):
+    title = f"Missing Tests: {os.path.basename(item['file'])}"
+    body = f"""
+# {title}
+
+**File**: `{item['file']}`
+**Difficulty**: {item['difficulty']}
+
+## Description
+The file `{item['file']}` appears to be missing a corresponding test file.
+Adding unit tests helps ensure code stability and reliability.
+
+## Why this is good for beginners
+{"This file is relatively small, making it a great starting point for writing your first unit test." if item['difficulty'] == 'Easy' else "Writing tests is a great way to learn the codebase."}
+"""
+    return title, body
+
+
+def _render_complexity(item):
+    title = f"Refactor: {os.path.basename(item['file'])} is too complex"
+    body = f"""
+# {title}
+
+**File**: `{item['file']}`
+**Difficulty**: {item['difficulty']}
+
+## Description
+This file has {item['lines']} lines, which exceeds the recommended limit.
+Consider breaking it down into smaller modules or functions.
+"""
+    return title, body
+
+
+def _render_undocumented(item):
+    symbol = item.get('symbol', 'function')
+    title = f"Docs: Add docstring to {item['function']}"
+    body = f"""
+# {title}
+
+**File**: `{item['file']}:{item['line']}`
+**Difficulty**: {item['difficulty']}
+
+## Description
+The {symbol} `{item['function']}` is missing a docstring.
+Good documentation is essential for maintainability.
+
+## Why this is good for beginners
+Writing documentation is an excellent way to learn what a {symbol} does without risking breaking changes.
+"""
+    return title, body
+
+
+def _render_security(item):
+    title = f"Security: {item['issue']}"
+    body = f"""
+# {title}
+
+**File**: `{item['file']}`
+**Difficulty**: {item['difficulty']}
+**Pattern**: `{item.get('pattern', 'N/A')}`
+
+## Description
+A potential security risk was identified by static analysis.
+Pattern matched: `{item.get('pattern', 'N/A')}`
+
+## Suggestion
+Review this code carefully. Ensure inputs are validated and no secrets are hardcoded.
+"""
+    return title, body
+
+
+def _render_ai(item):
+    title = f"AI Found: {item['title']}"
+    body = f"""
+# {title}
+
+**File**: `{item['file']}:{item.get('line_number', 0)}`
+**Difficulty**: {item['difficulty']}
+**Type**: {item['type']}
+
+## Description
+{item['description']}
+
+## Suggestion
+{item['suggestion']}
+"""
+    return title, body
+
+
+# Report key -> (issue filename prefix, renderer), in report order
+RENDERERS = {
+    'todos': ('todo', _render_todo),
+    'missing_tests': ('test', _render_missing_test),
+    'complex_files': ('complexity', _render_complexity),
+    'undocumented_functions': ('doc', _render_undocumented),
+    'security_issues': ('security', _render_security),
+    'ai_issues': ('ai', _render_ai),
+}
+REPORT_KINDS = list(RENDERERS)
@@ -0,0 +1,170 @@
+import bisect
+import os
+import re
+import sys
+from itertools import islice
+from typing import Dict, List, Optional, Sequence, Tuple
+
+CODE = 'code'
+COMMENT = 'comment'
+STRING = 'string'
+DOCSTRING = 'docstring' # Python triple-quoted string standing alone on its line
+
+# Lexer tables, part of rules_version() since they decide where the rules in
+# RULE_SPANS look.
+#   line_comments:  tokens that comment out the rest of the line
+#   block_comments: (open, close) pairs
+#   strings:        (quote, multiline) pairs; backslash escapes everywhere, and
+#                   a single-line string left open ends at the newline
+LANGUAGES = {
+    'python': {
+        'line_comments': ('#',),
+        'block_comments': (),
+        'strings': (('"""', True), ("'''", True), ('"', False), ("'", False)),
+        'docstrings': True,
+    },
+    'javascript': { # And TypeScript; template literals are one string, ${} included
+        'line_comments': ('//',),
+        'block_comments': (('/*', '*/'),),
+        'strings': (('"', False), ("'", False), ('`', True)),
+        'docstrings': False,
+    },
+    'java': {
+        'line_comments': ('//',),
+        'block_comments': (('/*', '*/'),),
+        'strings': (('"""', True), ('"', False), ("'", False)),
+        'docstrings': False,
+    },
+    'c': { # And C++
+        'line_comments': ('//',),
+        'block_comments': (('/*', '*/'),),
+        'strings': (('"', False), ("'", False)),
+        'docstrings': False,
+    },
+}
+EXTENSION_LANGUAGES = {
+    '.py': 'python',
+    '.js': 'javascript', '.jsx': 'javascript', '.ts': 'javascript', '.tsx': 'javascript',
+    '.java': 'java',
+    '.c': 'c', '.h': 'c', '.cpp': 'c',
+}
+
+_DOCSTRING_PREFIXES = ('', 'r', 'u', 'R', 'U')
+LEX_BATCH = 64 # Tokens lexed at a time when looking up an offset
+_AFTER = sys.maxsize # Sorts after any end offset
+
+
+def language_for(file_path: str) -> Optional[str]:
+    return EXTENSION_LANGUAGES.get(os.path.splitext(file_path)[1])
+
+
+def _string_end(quote: str, multiline: bool) -> str:
+    # Unrolled loops (no nested quantifiers on the same text), so matching is
+    # linear in the length of the string
+    q = re.escape(quote)
+    if len(quote) == 1:
+        if multiline:
+            return rf'[^{q}\\]*(?:\\.[^{q}\\]*)*(?:{q}|\Z)'
+        return rf'[^{q}\\\n]*(?:\\.[^{q}\\\n]*)*(?:{q}|(?=\n)|\Z)'
+    first, rest = re.escape(quote[0]), re.escape(quote[1:])
+    return rf'[^{first}\\]*(?:(?:\\.|{first}(?!{rest}))[^{first}\\]*)*(?:{q}|\Z)'
+
+
+def _block_end(close: str) -> str:
+    # Same idea for a block comment; left open, it runs to the end of the file
+    if close != '*/':
+        return rf'(?:(?!{re.escape(close)}).)*(?:{re.escape(close)}|\Z)'
+    return r'[^*]*(?:\*+[^*/][^*]*)*(?:\*+/|\Z)'
+
+
+class _Table:
+    # One language's tables compiled for one haystack type (str or bytes)
+
+    def __init__(self, table: Dict, as_bytes: bool):
+        def encode(value):
+            return value.encode('utf-8') if as_bytes else value
+
+        self.newline = encode('\n')
+        self.docstring_prefixes = tuple(encode(prefix) for prefix in _DOCSTRING_PREFIXES)
+        tokens = {} # Opening token -> (kind, rest of the token)
+        for token in table['line_comments']:
+            tokens[token] = (COMMENT, r'[^\n]*')
+        for start, end in table['block_comments']:
+            tokens[start] = (COMMENT, _block_end(end))
+        for quote, multiline in table['strings']:
+            kind = DOCSTRING if table['docstrings'] and len(quote) == 3 else STRING
+            tokens[quote] = (kind, _string_end(quote, multiline))
+        # Longest first, so '"""' wins over '"'
+        openers = sorted(tokens, key=len, reverse=True)
+        self.kinds = [(encode(opener), tokens[opener][0]) for opener in openers]
+        self.longest = len(openers[0])
+        # Every token in one alternation: one finditer walks the whole file
+        self.pattern = re.compile(encode('|'.join(re.escape(opener) + tokens[opener][1] for opener in openers)), re.DOTALL)
+
+
+_tables = {} # (language, as_bytes) -> _Table
+
+
+def _table(language: str, as_bytes: bool) -> _Table:
+    table = _tables.get((language, as_bytes))
+    if table is None:
+        table = _tables[(language, as_bytes)] = _Table(LANGUAGES[language], as_bytes)
+    return table
+
+
+class Spans:
+    """
+    Comment, string and docstring spans of one file (str or a UTF-8 buffer,
+    offsets are into that), everything else being code. Lexed in one linear
+    pass, but lazily: span_at() only lexes as far as the offset it is asked
+    about, so a file whose only hit is near the top is barely lexed at all.
+    A span's kind is only worked out when it is asked for.
+    """
+
+    def __init__(self, source, language: str):
+        self.source = source
+        self._table = _table(language, not isinstance(source, str))
+        self._tokens = self._table.pattern.finditer(source)
+        self._spans = [] # (start, end), in order
+        self._pos = 0 # Everything before this is lexed
+        self._done = False
+
+    def kind_at(self, offset: int) -> str:
+        return self.span_at(offset)[0]
+
+    def span_at(self, offset: int) -> Tuple[str, Optional[int]]:
+        # (kind, end offset) of the span around offset; the end is None for code
+        while self._pos <= offset and not self._done:
+            self._lex(LEX_BATCH)
+        spans = self._spans
+        i = bisect.bisect_right(spans, (offset, _AFTER)) - 1
+        if i >= 0 and offset < spans[i][1]:
+            return self._kind(spans[i][0]), spans[i][1]
+        return CODE, None
+
+    def spans(self, kinds: Sequence[str] = (COMMENT, STRING, DOCSTRING)) -> List[Tuple[int, int]]:
+        # (start, end) of every span of the given kinds, lexing the rest of the file
+        while not self._done:
+            self._lex(None)
+        return [(start, end) for start, end in self._spans if self._kind(start) in kinds]
+
+    def _lex(self, count: Optional[int]):
+        batch = [match.span() for match in islice(self._tokens, count)]
+        if count is None or len(batch) < count:
+            self._done = True
+        if batch:
+            self._spans.extend(batch)
+            self._pos = batch[-1][1]
+
+    def _kind(self, start: int) -> str:
+        source = self.source
+        table = self._table
+        head = source[start:start + table.longest]
+        for opener, kind in table.kinds:
+            if head.startswith(opener):
+                break
+        if kind == DOCSTRING:
+            line_start = source.rfind(table.newline, 0, start) + 1
+            if source[line_start:start].strip() not in table.docstring_prefixes:
+                kind = STRING
+        return kind
@@ -1,193 +1,307 @@
 import argparse
 import os
+import sys
 import json
+from generator.detectors import DetectorRegistry
+from generator.gitfiles import GitError, changed_files
+from generator.issues import generate_issue_files
+from generator.report import JsonlSink, IssueSink
 from generator.scanner import Scanner
-try:
-    from dotenv import load_dotenv
-except ImportError:
-    load_dotenv = lambda: None
-    
-import hashlib
 
+# Startup time matters (pre-commit hooks run this constantly): anything not
+# needed to scan the first file is imported where it is used. See
+# `python -m generator.bench --startup`.
 
-#TODO : add docstring to generate_issue_files
 
+def load_dotenv():
+    try:
+        from dotenv import load_dotenv as load
+    except ImportError:
+        return
+    load()
 
-def generate_issue_files(report, output_dir):
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # Process TODOs
-    for item in report['todos']:
-        title = f"TODO: {item['content'][:50]}..."
-        body = f"""
-# {title}
-
-**File**: `{item['file']}:{item['line']}`
-**Difficulty**: {item['difficulty']}
-
-## Description
-Found a TODO comment which might need addressing:
-```python
-{item['content']}
-```
-
-## detailed context
-This TODO was identifying during an automated scan of the codebase.
-"""
-        _write_issue(output_dir, 'todo', item, title, body)
-
-    # Process Missing Tests
-    for item in report['missing_tests']:
-        title = f"Missing Tests: {os.path.basename(item['file'])}"
-        body = f"""
-# {title}
-
-**File**: `{item['file']}`
-**Difficulty**: {item['difficulty']}
-
-## Description
-The file `{item['file']}` appears to be missing a corresponding test file.
-Adding unit tests helps ensure code stability and reliability.
-
-## Why this is good for beginners
-{"This file is relatively small, making it a great starting point for writing your first unit test." if item['difficulty'] == 'Easy' else "Writing tests is a great way to learn the codebase."}
-"""
-        _write_issue(output_dir, 'test', item, title, body)
-
-    # Process Complexity
-    for item in report['complex_files']:
-        title = f"Refactor: {os.path.basename(item['file'])} is too complex"
-        body = f"""
-# {title}
-
-**File**: `{item['file']}`
-**Difficulty**: {item['difficulty']}
-
-## Description
-This file has {item['lines']} lines, which exceeds the recommended limit.
-Consider breaking it down into smaller modules or functions.
-"""
-        _write_issue(output_dir, 'complexity', item, title, body)
-
-    # Process Undocumented Functions
-    for item in report['undocumented_functions']:
-        title = f"Docs: Add docstring to {item['function']}"
-        body = f"""
-# {title}
-
-**File**: `{item['file']}:{item['line']}`
-**Difficulty**: {item['difficulty']}
-
-## Description
-The function `{item['function']}` is missing a docstring.
-Good documentation is essential for maintainability.
-
-## Why this is good for beginners
-Writing documentation is an excellent way to learn what a function does without risking breaking changes.
-"""
-        _write_issue(output_dir, 'doc', item, title, body)
-
-        _write_issue(output_dir, 'doc', item, title, body)
-
-    # Process Security Issues
-    for item in report.get('security_issues', []):
-        title = f"Security: {item['issue']}"
-        body = f"""
-# {title}
-
-**File**: `{item['file']}`
-**Difficulty**: {item['difficulty']}
-**Pattern**: `{item.get('pattern', 'N/A')}`
-
-## Description
-A potential security risk was identified by static analysis.
-Pattern matched: `{item.get('pattern', 'N/A')}`
-
-## Suggestion
-Review this code carefully. Ensure inputs are validated and no secrets are hardcoded.
-"""
-        _write_issue(output_dir, 'security', item, title, body)
-
-    # Process AI Issues
-    for item in report.get('ai_issues', []):
-        title = f"AI Found: {item['title']}"
-        body = f"""
-# {title}
-
-**File**: `{item['file']}:{item.get('line_number', 0)}`
-**Difficulty**: {item['difficulty']}
-**Type**: {item['type']}
-
-## Description
-{item['description']}
-
-## Suggestion
-{item['suggestion']}
-"""
-        _write_issue(output_dir, 'ai', item, title, body)
-
-def _write_issue(output_dir, type_prefix, item, title, body):
-    # Create a unique hash for the filename to avoid collisions and keep it short
-    hasher = hashlib.md5()
-    hasher.update(str(item).encode('utf-8'))
-    file_hash = hasher.hexdigest()[:8]
-    
-    filename = f"issue_{type_prefix}_{file_hash}.md"
-    filepath = os.path.join(output_dir, filename)
-    
-    # Add labels section for GitHub Action to parse if needed
-    labels = ', '.join(item.get('tags', []))
-    content = f"""---
-title: "{title}"
-labels: {labels}
----
-{body}
-"""
-    with open(filepath, 'w') as f:
-        f.write(content)
 
 def main():
+    # Subcommands come first on the command line; anything else is a scan
+    if sys.argv[1:2] and sys.argv[1] in SUBCOMMANDS:
+        return SUBCOMMANDS[sys.argv[1]](sys.argv[2:])
+
     parser = argparse.ArgumentParser(description='First Issue Generator')
     parser.add_argument('--path', type=str, default='.', help='Path to scan')
     parser.add_argument('--output', type=str, default='./generated_issues', help='Output directory')
     parser.add_argument('--ai', action='store_true', help='Enable AI-based scanning')
+    parser.add_argument('--ai-cache-dir', type=str, default=None, help='Directory for caching AI responses by file content')
+    parser.add_argument('--ai-cache-size', type=int, default=100, help='Maximum AI cache size in MB (least recently used entries are evicted)')
+    parser.add_argument('--ai-rpm', type=float, default=15, help='Maximum AI requests per minute')
+    parser.add_argument('--ai-tpm', type=float, default=1_000_000, help='Maximum AI tokens per minute')
+    parser.add_argument('--ai-concurrency', type=int, default=4, help='Maximum concurrent AI requests')
+    parser.add_argument('--ai-batch-tokens', type=int, default=0,
+                        help='Pack flagged files into multi-file AI requests of up to this many tokens (0 = one request per file)')
+    parser.add_argument('--ai-chunk-tokens', type=int, default=8000,
+                        help='Split files bigger than this many tokens into overlapping windows for AI review')
+    parser.add_argument('--ai-max-requests', type=int, default=None,
+                        help='AI budget: at most this many requests, spent on the highest-priority files first')
+    parser.add_argument('--ai-max-tokens', type=int, default=None, help='AI budget: at most this many (estimated) tokens')
+    parser.add_argument('--ai-max-seconds', type=float, default=None, help='AI budget: stop AI review after this many seconds')
+    parser.add_argument('--exclude', action='append', default=None, metavar='PATTERN',
+                        help='Gitignore-style pattern to skip (repeatable; added to the default excludes '
+                             "of .git/, __pycache__/, venv/, .venv/ and node_modules/, '!venv/' re-includes one)")
+    parser.add_argument('--no-gitignore', action='store_true', help='Do not honour .gitignore and .git/info/exclude')
+    parser.add_argument('--since', type=str, default=None, metavar='REF',
+                        help='Only scan files changed since this git ref (plus untracked files); skips the directory walk')
+    parser.add_argument('--enumerator', choices=['walk', 'git', 'auto'], default='walk',
+                        help='How to list files: walk the directory tree, read the git index (tracked files only), '
+                             'or auto (the git index when the path is in a repository)')
+    parser.add_argument('--jobs', '-j', type=int, default=1, help='Number of worker processes for file scanning (0 = all cores)')
+    parser.add_argument('--cache', type=str, default=None, help='Path to an incremental scan cache file (created if missing)')
+    parser.add_argument('--cache-verify', action='store_true', help='Validate cache entries by content hash instead of size/mtime')
+    parser.add_argument('--jsonl', type=str, default=None, help='Also stream every finding to this JSONL file as it is found')
+    parser.add_argument('--store', type=str, default=None,
+                        help='Also record this run in a SQLite findings database (see the query subcommand; not with --since)')
+    parser.add_argument('--stream', action='store_true', help='Write issue templates while scanning instead of keeping findings in memory')
+    parser.add_argument('--docs-ast', action='store_true',
+                        help='Find undocumented functions, methods and classes from the parsed AST (slower, more accurate)')
+    parser.add_argument('--detectors-config', type=str, default=None,
+                        help='JSON file declaring extra detectors or switching built-in ones on/off')
+    parser.add_argument('--enable-detector', action='append', default=[], metavar='NAME', help='Run this detector (repeatable)')
+    parser.add_argument('--disable-detector', action='append', default=[], metavar='NAME', help='Skip this detector (repeatable)')
+    parser.add_argument('--list-detectors', action='store_true', help='List the known detectors and exit')
+    parser.add_argument('--profile', action='store_true', help='Time every phase and detector and print a summary table')
+    parser.add_argument('--profile-json', type=str, default=None, help='Write profiling results as JSON to this file (implies --profile)')
     
     args = parser.parse_args()
+
+    registry = DetectorRegistry()
+    try:
+        registry.load_entry_points()
+        if args.detectors_config:
+            registry.load_config(args.detectors_config)
+        enable, disable = list(args.enable_detector), list(args.disable_detector)
+        if args.docs_ast:
+            enable.append('docs_ast')
+            disable.append('docs')
+        detectors = registry.select(enable, disable)
+    except (OSError, ValueError, TypeError, ImportError) as e:
+        parser.error(f"detectors: {e}")
+    if args.list_detectors:
+        for spec in registry.specs.values():
+            state = 'on' if spec in detectors else 'off'
+            print(f"{spec.name:<16} {state:<4} {spec.kind:<24} {' '.join(spec.extensions):<40} {spec.target}")
+        return
     
-    # Load env vars
-    load_dotenv()
-    ai_api_key = os.getenv('GEMINI_API_KEY')
+    # Load env vars (only the AI needs any)
+    ai_api_key = None
+    if args.ai:
+        load_dotenv()
+        ai_api_key = os.getenv('GEMINI_API_KEY')
     
     if args.ai and not ai_api_key:
         print("Warning: --ai flag provided but GEMINI_API_KEY not found in environment. AI scanning disabled.")
         args.ai = False
 
+    if args.store and args.since:
+        parser.error("--store records full scans only; --since would make unscanned findings look resolved")
+
+    paths = None
+    if args.since:
+        try:
+            paths = changed_files(args.path, args.since)
+        except GitError as e:
+            parser.error(f"--since {args.since}: {e}")
+        print(f"Scanning {len(paths)} files changed since {args.since}")
+    # Issue files from a previous run are only known stale after a full scan
+    prune = paths is None
+
+    sinks = []
+    if args.jsonl:
+        sinks.append(JsonlSink(args.jsonl))
+    if args.store:
+        from generator.store import StoreSink
+        sinks.append(StoreSink(args.store, args.path))
+    issue_sink = None
+    if args.stream:
+        print(f"Streaming issue templates to: {args.output}")
+        issue_sink = IssueSink(args.output, prune=prune)
+        sinks.append(issue_sink)
+
+    profiler = None
+    if args.profile or args.profile_json:
+        from generator.profiling import Profiler
+        profiler = Profiler()
+
     print(f"Scanning codebase at: {args.path}")
-    scanner = Scanner(args.path, enable_ai=args.ai, ai_api_key=ai_api_key)
-    scanner.scan()
+    scanner = Scanner(args.path, enable_ai=args.ai, ai_api_key=ai_api_key, jobs=args.jobs,
+                      cache_path=args.cache, cache_verify=args.cache_verify, ai_cache_dir=args.ai_cache_dir,
+                      ai_cache_max_bytes=args.ai_cache_size * 1024 * 1024, ai_rpm=args.ai_rpm, ai_tpm=args.ai_tpm,
+                      ai_concurrency=args.ai_concurrency, ai_batch_tokens=args.ai_batch_tokens,
+                      ai_chunk_tokens=args.ai_chunk_tokens, ai_max_requests=args.ai_max_requests,
+                      ai_max_tokens=args.ai_max_tokens, ai_max_seconds=args.ai_max_seconds, excludes=args.exclude, use_gitignore=not args.no_gitignore,
+                      sinks=sinks, keep_findings=not args.stream, profiler=profiler, enumerator=args.enumerator, detectors=detectors)
+    success = False
+    try:
+        scanner.scan(paths)
+        success = True
+    except GitError as e:
+        parser.error(f"--enumerator git: {e}")
+    finally:
+        for sink in sinks:
+            sink.close(success)
     report = scanner.get_report()
     
+    if scanner.cache:
+        print(f"Cache: {scanner.cache.hits} unchanged, {scanner.cache.misses} rescanned")
     # Filter statistics for ease of reading log
-    todos_count = len(report['todos'])
-    tests_count = len(report['missing_tests'])
-    complex_count = len(report['complex_files'])
-    docs_count = len(report['undocumented_functions'])
+    todos_count = scanner.counts['todos']
+    tests_count = scanner.counts['missing_tests']
+    complex_count = scanner.counts['complex_files']
+    docs_count = scanner.counts['undocumented_functions']
     
     print(f"Found {todos_count} TODOs")
     print(f"Found {tests_count} missing tests")
     print(f"Found {complex_count} complex files")
     print(f"Found {docs_count} undocumented functions")
     
-    security_count = len(report.get('security_issues', []))
+    security_count = scanner.counts['security_issues']
     print(f"Found {security_count} security hotspots")
     
     if args.ai:
-        ai_count = len(report.get('ai_issues', []))
+        ai_count = scanner.counts['ai_issues']
         print(f"Found {ai_count} AI-detected issues")
+        if scanner.ai_scheduler is not None:
+            budget = scanner.ai_scheduler
+            print(f"AI budget: reviewed {budget.scheduled} files ({budget.requests} requests, ~{budget.tokens} tokens), "
+                  f"skipped {budget.skipped}, {budget.timed_out} requests cut off by the time limit")
     
-    print(f"Generating issue templates to: {args.output}")
-    generate_issue_files(report, args.output)
+    if args.stream:
+        writer = issue_sink.writer
+    else:
+        print(f"Generating issue templates to: {args.output}")
+        if profiler:
+            with profiler.phase('issues'):
+                writer = generate_issue_files(report, args.output, prune=prune)
+        else:
+            writer = generate_issue_files(report, args.output, prune=prune)
+    print(f"Issue files: {writer.written} written, {writer.unchanged} unchanged, {writer.removed} removed")
+
+    if profiler:
+        print(profiler.format_table())
+        if args.profile_json:
+            profiler.write_json(args.profile_json)
     print("Done!")
 
+
+def query_main(argv):
+    import sqlite3
+    from datetime import datetime
+    from generator.store import COUNT_COLUMNS, connect, count_findings, latest_run, list_runs, query_findings
+
+    parser = argparse.ArgumentParser(prog='generator.main query', description='Query findings recorded with --store')
+    parser.add_argument('--store', type=str, required=True, help='SQLite findings database')
+    parser.add_argument('--runs', action='store_true', help='List recorded runs instead of findings')
+    parser.add_argument('--run', type=int, default=None, help='Run id (default: the latest finished run)')
+    parser.add_argument('--kind', type=str, default=None, help='Only this report key (todos, security_issues, ...)')
+    parser.add_argument('--file', type=str, default=None, metavar='GLOB', help="Only files matching this glob ('*/scanner.py')")
+    parser.add_argument('--fingerprint', type=str, default=None, help='Only this finding')
+    parser.add_argument('--new', action='store_true', help='Only findings that were not in the previous run')
+    parser.add_argument('--new-since', type=int, default=None, metavar='RUN', help='Only findings that were not in this run')
+    parser.add_argument('--count-by', choices=list(COUNT_COLUMNS), default=None, help='Print counts per group instead of findings')
+    parser.add_argument('--limit', type=int, default=None, help='Print at most this many rows')
+    parser.add_argument('--json', action='store_true', help='Print findings as JSON lines (like --jsonl)')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.store):
+        parser.error(f"no findings database at {args.store}")
+    try:
+        conn = connect(args.store, readonly=True)
+    except sqlite3.DatabaseError as e:
+        parser.error(f"{args.store}: not a findings database ({e})")
+    try:
+        if args.runs:
+            for run_id, root, started_at, finished_at, findings in list_runs(conn, args.limit or 20):
+                started = datetime.fromtimestamp(started_at).strftime('%Y-%m-%d %H:%M:%S')
+                status = f"{findings} findings" if finished_at is not None else 'unfinished'
+                print(f"{run_id:>6}  {started}  {status:>16}  {root}")
+            return
+
+        run_id = args.run if args.run is not None else latest_run(conn)
+        if run_id is None:
+            parser.error(f"{args.store} has no finished runs")
+        new_since = args.new_since
+        if args.new and new_since is None:
+            new_since = latest_run(conn, before=run_id)
+            if new_since is None:
+                parser.error(f"run {run_id} is the first run: nothing to compare --new against")
+        filters = {'kind': args.kind, 'file': args.file, 'fingerprint': args.fingerprint,
+                   'new_since': new_since, 'limit': args.limit}
+
+        if args.count_by:
+            for group, count in count_findings(conn, run_id, args.count_by, **filters):
+                print(f"{count:>8}  {group}")
+            return
+        for kind, fingerprint, file, line, summary, data in query_findings(conn, run_id, **filters):
+            if args.json:
+                print(json.dumps(dict(json.loads(data), kind=kind)))
+            else:
+                location = file if line is None else f"{file}:{line}"
+                print(f"{fingerprint}  {kind:<22}  {location}  {summary}")
+    except sqlite3.DatabaseError as e:
+        parser.error(f"{args.store}: {e}")
+    finally:
+        conn.close()
+
+
+def diff_main(argv):
+    from generator.delta import diff_reports, finding, read_sorted
+    from generator.issues import IssueWriter
+
+    parser = argparse.ArgumentParser(prog='generator.main diff',
+                                     description='Compare two reports by finding fingerprint: what is new, resolved, unchanged')
+    parser.add_argument('old', help='Earlier report: a --jsonl file, or a --store database as PATH[:RUN] '
+                                    "(RUN is a run id, 'latest' or 'previous'; default latest)")
+    parser.add_argument('new', help='Later report, same forms')
+    parser.add_argument('--new-jsonl', type=str, default=None, help='Write new findings to this JSONL file')
+    parser.add_argument('--resolved-jsonl', type=str, default=None, help='Write resolved findings to this JSONL file')
+    parser.add_argument('--unchanged-jsonl', type=str, default=None, help='Write unchanged findings to this JSONL file')
+    parser.add_argument('--issues', type=str, default=None, metavar='DIR',
+                        help='Write issue templates for the new findings only to this directory (existing files are kept)')
+    parser.add_argument('--quiet', action='store_true', help='Only print the totals')
+    args = parser.parse_args(argv)
+
+    outputs = {}
+    for status in ('new', 'resolved', 'unchanged'):
+        path = getattr(args, f"{status}_jsonl")
+        if path:
+            outputs[status] = open(path, 'w', encoding='utf-8')
+    # Adds to DIR: the other issue files there are not stale just because they aren't new
+    writer = IssueWriter(args.issues, prune=False) if args.issues else None
+    counts = {'new': 0, 'resolved': 0, 'unchanged': 0}
+    try:
+        for status, row in diff_reports(read_sorted(args.old), read_sorted(args.new)):
+            counts[status] += 1
+            if status == 'unchanged' and status not in outputs:
+                continue # The bulk of most diffs: not even parsed
+            item = finding(row)
+            if status in outputs:
+                outputs[status].write(json.dumps(item) + '\n')
+            kind = item.pop('kind')
+            if status == 'new' and writer:
+                writer.write(kind, item)
+            if status != 'unchanged' and not args.quiet:
+                line = item.get('line', item.get('line_number'))
+                location = item['file'] if line is None else f"{item['file']}:{line}"
+                print(f"{'+' if status == 'new' else '-'} {row[0]}  {kind:<22}  {location}")
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    finally:
+        for f in outputs.values():
+            f.close()
+        if writer:
+            writer.close()
+    print(f"{counts['new']} new, {counts['resolved']} resolved, {counts['unchanged']} unchanged")
+
+
+SUBCOMMANDS = {'query': query_main, 'diff': diff_main}
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,133 @@
+import re
+from functools import cached_property
+from typing import List, Optional, Tuple
+
+from generator.lexer import COMMENT, Spans, language_for
+
+# Block openers that name a scope (see enclosing_scope)
+_PYTHON_SCOPE = re.compile(r'\s*(?:async\s+)?(?:def|class)\s+(\w+)')
+_SLASH_SCOPE = re.compile(r'\s*(?:(?:class|interface|struct|enum|function)\s+(\w+)|(?:[\w<>\[\],*&:]+\s+)*(\w+)\s*\()')
+_NOT_SCOPES = {None, 'if', 'for', 'while', 'switch', 'catch', 'return', 'else', 'do', 'try', 'synchronized'}
+_COMMENT_STARTS = ('#', '//', '/*', '*')
+
+
+class ParsedFile:
+    """
+    One source file as the detectors see it. Built once per file, from decoded
+    text or from a UTF-8 buffer (an mmap for large files); every view is
+    computed on first use and memoized, so it costs the same whether one
+    detector asks for it or all of them do.
+    """
+
+    def __init__(self, path: str, text: str = None, buffer=None, size: int = None):
+        self.path = path
+        self.python = path.endswith('.py')
+        self.buffer = buffer # Only valid while the caller keeps it open
+        self.size = size
+        self._openers = {} # Line index -> index of its block opener, memoized by enclosing_scope
+        if text is not None:
+            self.text = text # Fills the cached_property
+
+    @cached_property
+    def text(self) -> str:
+        return str(self.buffer, 'utf-8')
+
+    @cached_property
+    def line_count(self) -> int:
+        # Like iterating a text file: a trailing newline doesn't start another line
+        text = self.text
+        return text.count('\n') + (not text.endswith('\n') and text != '')
+
+    @cached_property
+    def lines(self) -> List[str]:
+        lines = self.text.split('\n')
+        if lines[-1] == '':
+            lines.pop()
+        return lines
+
+    @cached_property
+    def stripped(self) -> List[str]:
+        return [line.strip() for line in self.lines]
+
+    @cached_property
+    def indents(self) -> List[int]:
+        return [len(line) - len(line.lstrip()) for line in self.lines]
+
+    @cached_property
+    def lowered(self) -> str:
+        return self.text.lower()
+
+    @cached_property
+    def spans(self) -> Optional[Spans]:
+        # Lexer spans of the buffer if there is one (byte offsets), else of
+        # text; None for languages the lexer doesn't know
+        language = language_for(self.path)
+        if language is None:
+            return None
+        return Spans(self.buffer if self.buffer is not None else self.text, language)
+
+    @cached_property
+    def comment_spans(self) -> List[Tuple[int, int]]:
+        # (start, end) offsets into text
+        if self.buffer is None and self.spans is not None:
+            return self.spans.spans((COMMENT,))
+        language = language_for(self.path)
+        return Spans(self.text, language).spans((COMMENT,)) if language else []
+
+    @cached_property
+    def tree(self) -> Optional[object]:
+        # Module AST for Python files that parse, None otherwise
+        if not self.python:
+            return None
+        from generator.docstrings import parse_python # ast is only loaded when a tree is wanted
+        return parse_python(self.text, self.path)
+
+    def enclosing_scope(self, line_number: int) -> str:
+        """
+        Dotted name of the functions/classes around line_number
+        ('Class.method'), or '' at module level. Judged by indentation: each
+        enclosing block opens on the nearest earlier code line indented less.
+        Always '' for buffer-backed (mmap) files, which are never decoded or
+        split into lines as a whole.
+        """
+        if self.buffer is not None:
+            return ''
+        lines = self.lines
+        openers = self._openers
+        pattern = _PYTHON_SCOPE if self.python else _SLASH_SCOPE
+        names = []
+        i = line_number - 1
+        while 0 <= i < len(lines):
+            i = openers.get(i) if i in openers else self._find_opener(i)
+            if i < 0:
+                break
+            match = pattern.match(lines[i])
+            name = match and match.group(match.lastindex)
+            if name not in _NOT_SCOPES:
+                names.append(name)
+        return '.'.join(reversed(names))
+
+    def _find_opener(self, i: int) -> int:
+        # Index of the line opening the block that line i sits in, -1 at top level
+        lines = self.lines
+        openers = self._openers
+        line = lines[i]
+        indent = len(line) - len(line.lstrip())
+        siblings = [i] # Code lines at the same depth share the opener
+        j = i - 1
+        while indent and j >= 0:
+            code = lines[j].lstrip()
+            if code and not code.startswith(_COMMENT_STARTS):
+                depth = len(lines[j]) - len(code)
+                if depth < indent:
+                    break
+                if j in openers:
+                    j = openers[j] # Everything in between is nested deeper
+                    continue
+                if depth == indent:
+                    siblings.append(j)
+            j -= 1
+        opener = j if indent else -1
+        for sibling in siblings:
+            openers[sibling] = opener
+        return opener
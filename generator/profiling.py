@@ -0,0 +1,62 @@
+import json
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List
+
+
+class Profiler:
+    """
+    Accumulates wall time, call count and bytes processed per phase name
+    ('walk', 'read', 'detect.todo', 'ai.wait', ...).
+
+    Hooks are called as hook(name, elapsed, nbytes) for every record. Phases
+    timed in pool workers are merged in (and hooked) once per file, and their
+    times add up across processes rather than wall clock.
+    """
+
+    def __init__(self, hooks: List[Callable[[str, float, int], None]] = None):
+        self.stats = {} # name -> [seconds, calls, bytes]; plain lists so workers can ship them
+        self.hooks = list(hooks or [])
+
+    def add_hook(self, hook: Callable[[str, float, int], None]):
+        self.hooks.append(hook)
+
+    @contextmanager
+    def phase(self, name: str, nbytes: int = 0):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, nbytes)
+
+    def record(self, name: str, elapsed: float, nbytes: int = 0, calls: int = 1):
+        entry = self.stats.get(name)
+        if entry is None:
+            entry = self.stats[name] = [0.0, 0, 0]
+        entry[0] += elapsed
+        entry[1] += calls
+        entry[2] += nbytes
+        for hook in self.hooks:
+            hook(name, elapsed, nbytes)
+
+    def merge(self, stats: Dict[str, List]):
+        for name, (elapsed, calls, nbytes) in stats.items():
+            self.record(name, elapsed, nbytes, calls)
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {'seconds': elapsed, 'calls': calls, 'bytes': nbytes}
+            for name, (elapsed, calls, nbytes) in sorted(self.stats.items())
+        }
+
+    def format_table(self) -> str:
+        rows = [f"{'phase':<24} {'seconds':>10} {'calls':>8} {'MB':>9} {'MB/s':>9}"]
+        for name, entry in self.to_dict().items():
+            mb = entry['bytes'] / (1024 * 1024)
+            rate = f"{mb / entry['seconds']:.1f}" if entry['bytes'] and entry['seconds'] else '-'
+            rows.append(f"{name:<24} {entry['seconds']:>10.4f} {entry['calls']:>8} {mb:>9.2f} {rate:>9}")
+        return "\n".join(rows)
+
+    def write_json(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
@@ -0,0 +1,39 @@
+import json
+from typing import Any, Dict
+
+from generator.issues import IssueWriter
+
+
+class JsonlSink:
+    """
+    Writes each finding as one JSON line as soon as it is produced:
+    {"kind": "<report key>", ...finding fields}
+
+    Sinks are closed with close(success), success being False when the
+    scan raised or was interrupted.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, kind: str, item: Dict[str, Any]):
+        self._file.write(json.dumps(dict(item, kind=kind)) + '\n')
+
+    def close(self, success: bool = True):
+        self._file.close()
+
+
+class IssueSink:
+    """Writes the markdown issue template for each finding as soon as it is produced."""
+
+    def __init__(self, output_dir: str, prune: bool = True):
+        self.output_dir = output_dir
+        self.writer = IssueWriter(output_dir, prune=prune)
+
+    def write(self, kind: str, item: Dict[str, Any]):
+        self.writer.write(kind, item)
+
+    def close(self, success: bool = True):
+        self.writer.close(success)
+
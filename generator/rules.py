@@ -0,0 +1,60 @@
+import hashlib
+import json
+import re
+
+from generator.lexer import LANGUAGES
+
+SOURCE_EXTENSIONS = ('.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.cpp', '.c', '.h')
+AI_CHUNK_TOKENS = 8000 # Files bigger than this go to the AI in several windows (see chunker)
+AI_CHUNK_OVERLAP = 20 # Lines repeated between consecutive windows
+MAX_AI_CHUNKS = 16 # Per file; windows past this are not reviewed
+MMAP_THRESHOLD = 1024 * 1024 # Files at least this big are scanned as mapped bytes
+
+# Detector rules. Anything that changes what a detector reports belongs here
+# (or bumps RULES_REVISION) so cached results get invalidated.
+RULES_REVISION = 6
+# A comment marker, a docstring/block comment opener or the start of a line
+# (inside a docstring or block comment), then TODO; group 2 is the TODO itself
+TODO_PATTERN = re.compile(r'(\#|//|/\*+|\*|"""|\'\'\'|^)\s*(TODO):?\s*(.*)', re.IGNORECASE)
+BEGINNER_KEYWORDS = ['easy', 'beginner', 'good first issue', 'simple', 'cleanup', 'doc']
+SECURITY_PATTERNS = {
+    'eval_usage': r'eval\s*\(',
+    'subprocess_shell': r'subprocess\..*shell=True',
+    'hardcoded_password': r'(password|secret|key)\s*=\s*[\'"][^\'"]+[\'"]',
+    'noqa_blind': r'#\s*noqa(?!\s*:)'
+}
+# Lowercase literals that every match of a rule must contain. LineEngine only
+# runs the full (case-insensitive) rules on lines where one of these occurs.
+RULE_ANCHORS = {
+    'todo': ['todo'],
+    'eval_usage': ['eval'],
+    'subprocess_shell': ['subprocess'],
+    'hardcoded_password': ['password', 'secret', 'key'],
+    'noqa_blind': ['noqa'],
+}
+# Lexer spans (see generator.lexer) where a match of each rule counts, judged
+# at the start of the match (of the TODO itself for 'todo')
+RULE_SPANS = {
+    'todo': ('comment', 'docstring'),
+    'eval_usage': ('code',),
+    'subprocess_shell': ('code',),
+    'hardcoded_password': ('code',),
+    'noqa_blind': ('comment',),
+}
+MAX_FILE_LINES = 300
+MAX_INDENT = 20 # Arbitrary threshold for "deeply nested"
+
+
+def rules_version() -> str:
+    rules = {
+        'revision': RULES_REVISION,
+        'extensions': SOURCE_EXTENSIONS,
+        'todo': [TODO_PATTERN.pattern, TODO_PATTERN.flags, BEGINNER_KEYWORDS],
+        'security': SECURITY_PATTERNS,
+        'anchors': RULE_ANCHORS,
+        'spans': RULE_SPANS,
+        'languages': LANGUAGES,
+        'max_file_lines': MAX_FILE_LINES,
+        'max_indent': MAX_INDENT,
+    }
+    return hashlib.sha256(json.dumps(rules, sort_keys=True).encode('utf-8')).hexdigest()[:16]
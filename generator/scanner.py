@@ -1,16 +1,90 @@
+import mmap
 import os
-import re
-import time
+from collections import Counter
+from contextlib import nullcontext
 from typing import List, Dict, Any
 
+from generator.detectors import DetectorSpec, detectors_version, select_detectors
+from generator.engine import LineEngine, LineHits
+from generator.fingerprint import FingerprintIndex
+from generator.parsed_file import ParsedFile
+from generator.chunker import chunk_lines, merge_chunk_issues
+from generator.rules import AI_CHUNK_TOKENS, AI_CHUNK_OVERLAP, MAX_AI_CHUNKS, SOURCE_EXTENSIONS, MMAP_THRESHOLD, rules_version
+from generator.walker import walk, filter_excluded
+
+ANALYSIS_BATCH = 256 # Files per batch and per worker process
+
+# Per-process scanner used by pool workers (see _analyze_in_worker)
+_worker_scanner = None
+
+
+def _init_worker(root_path: str, enable_ai: bool, profile: bool, detectors: List[DetectorSpec]):
+    global _worker_scanner
+    profiler = None
+    if profile:
+        from generator.profiling import Profiler
+        profiler = Profiler()
+    _worker_scanner = Scanner(root_path, enable_ai=enable_ai, profiler=profiler, detectors=detectors)
+
+
+def _analyze_in_worker(file_path: str):
+    profiler = _worker_scanner.profiler
+    if profiler is None:
+        return _worker_scanner._analyze_file(file_path)
+    # Ship this file's timings back with its record; the parent merges them
+    profiler.stats = {}
+    result = _worker_scanner._analyze_file(file_path)
+    result['profile'] = profiler.stats
+    return result
+
+
 class Scanner:
-    def __init__(self, root_path: str, enable_ai: bool = False, ai_api_key: str = None):
+    def __init__(self, root_path: str, enable_ai: bool = False, ai_api_key: str = None, jobs: int = 1,
+                 cache_path: str = None, cache_verify: bool = False, ai_cache_dir: str = None,
+                 ai_cache_max_bytes: int = 100 * 1024 * 1024, ai_rpm: float = 15, ai_tpm: float = 1_000_000,
+                 ai_concurrency: int = 4, ai_batch_tokens: int = 0,
+                 ai_chunk_tokens: int = AI_CHUNK_TOKENS, ai_max_requests: int = None, ai_max_tokens: int = None,
+                 ai_max_seconds: float = None, excludes: List[str] = None, use_gitignore: bool = True,
+                 sinks: List[Any] = None, keep_findings: bool = True, profiler=None,
+                 docs_ast: bool = False, enumerator: str = 'walk', detectors: List[DetectorSpec] = None):
         self.root_path = root_path
+        self.excludes = excludes
+        self.use_gitignore = use_gitignore
+        # How files are listed: 'walk' the tree, read the 'git' index (tracked
+        # files only), or 'auto' (the index when root is in a git repo)
+        self.enumerator = enumerator
+        # Per-file detectors to run (see generator.detectors). By default the
+        # built-ins; docs_ast swaps in the docstring check from the parsed AST
+        # (async defs, methods, classes, multi-line signatures), which is much
+        # slower: parsing costs far more than the regex pass.
+        self.detectors = list(detectors) if detectors is not None else select_detectors(docs_ast)
+        self._detectors_by_ext = {}
+        line_rules = sorted({rule for spec in self.detectors for rule in spec.line_rules})
+        self.engine = LineEngine(line_rules)
         self.enable_ai = enable_ai
+        self.jobs = max(1, jobs or os.cpu_count() or 1)
+        self.cache = None
+        if cache_path:
+            from generator.cache import ScanCache
+            # AI candidacy is part of the cached record, so it is part of the version too
+            self.cache = ScanCache(cache_path, f"{rules_version()}-ai{int(enable_ai)}-{detectors_version(self.detectors)}",
+                                   verify_content=cache_verify)
         self.ai_scanner = None
         if enable_ai and ai_api_key:
             from generator.ai_scanner import AIScanner
-            self.ai_scanner = AIScanner(ai_api_key)
+            self.ai_scanner = AIScanner(ai_api_key, cache_dir=ai_cache_dir, cache_max_bytes=ai_cache_max_bytes)
+        self.ai_limits = {'requests_per_minute': ai_rpm, 'tokens_per_minute': ai_tpm, 'max_concurrency': ai_concurrency,
+                          'batch_tokens': ai_batch_tokens}
+        # Window size for the file content sent to the AI, in characters, matching
+        # AIScanner.estimate_tokens (~4 characters per token plus a fixed prompt)
+        self.ai_chunk_chars = max(1000, ai_chunk_tokens * 4 - 2000)
+        self.ai_pipeline = None
+        self._ai_futures = [] # (file_path, [(chunk, future)])
+        # With any budget set, candidates are queued during the walk and the
+        # best ones are sent afterwards (see AIScheduler); otherwise every
+        # candidate is sent as soon as it is found
+        self.ai_budget = {'max_requests': ai_max_requests, 'max_tokens': ai_max_tokens, 'max_seconds': ai_max_seconds}
+        self.ai_scheduler = None
             
         self.todos = []
         self.missing_tests = []
@@ -18,198 +92,353 @@ class Scanner:
         self.undocumented_functions = []
         self.security_issues = []
         self.ai_issues = []
+        self._test_files = set()
+        self._partial = False # Scanning a subset of files (see scan(paths))
 
-    def scan(self):
-        for root, _, files in os.walk(self.root_path):
-            if '.git' in root or '__pycache__' in root or 'venv' in root:
-                continue
-            
-            for file in files:
-                if file.endswith(('.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.cpp', '.c', '.h')):
-                    file_path = os.path.join(root, file)
-                    self._scan_file(file_path)
-                    
-            # Check for missing tests (heuristic: only for Python files for now)
-            for file in files:
-                if file.endswith('.py') and not file.startswith('test_') and not file.endswith('_test.py'):
-                     self._check_missing_test(root, file)
-
-    def _scan_file(self, file_path: str):
-        MAX_SCAN_LINES = 1000  # Limit scanning to first 1000 lines
-        lines_to_scan = []
-        total_lines = 0
+        # Findings are pushed to every sink (write(kind, item)) as they are produced.
+        # With keep_findings=False nothing is retained, so memory stays flat.
+        self.sinks = list(sinks or [])
+        self.keep_findings = keep_findings
+        self.counts = Counter()
+        # Every emitted finding carries a 'fingerprint' that survives line shifts
+        # (see generator.fingerprint); exact repeats are dropped here
+        self.fingerprints = FingerprintIndex(root_path)
+
+        # Optional generator.profiling.Profiler. When set, every phase is timed
+        # and each line detector runs as its own pass so its cost can be told
+        # apart (slower than the combined pass; results are the same).
+        self.profiler = profiler
+        self._detector_engines = {name: LineEngine([name]) for name in line_rules} if profiler else None
+
+    def _phase(self, name: str, nbytes: int = 0):
+        return self.profiler.phase(name, nbytes) if self.profiler else nullcontext()
+
+    def scan(self, paths: List[str] = None):
+        """
+        Scans every source file under root_path, or only the given file paths
+        (e.g. from generator.gitfiles.changed_files) without walking the tree.
+        """
+        if self.ai_scanner:
+            from generator.ai_pipeline import AIPipeline
+            self.ai_pipeline = AIPipeline(self.ai_scanner, **self.ai_limits)
+            if any(limit is not None for limit in self.ai_budget.values()):
+                self.ai_scheduler = self._create_scheduler()
 
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    total_lines += 1
-                    if len(lines_to_scan) < MAX_SCAN_LINES:
-                        lines_to_scan.append(line.rstrip('\n'))
-            
-            self._find_todos(file_path, lines_to_scan)
-            self._check_complexity(file_path, total_lines)
-            
-            nesting_found = self._check_nesting_depth(file_path, lines_to_scan)
-            security_found, security_reasons = self._check_security_patterns(file_path, lines_to_scan)
-
-            if file_path.endswith('.py'):
-                self._check_docs(file_path, lines_to_scan)
-
-            if self.enable_ai and self.ai_scanner:
-                should_scan, reason = self._is_candidate_for_ai(file_path, total_lines, nesting_found, security_found, security_reasons)
-                if should_scan:
-                    self._scan_with_ai(file_path, "\n".join(lines_to_scan), reason)
-                    
-        except UnicodeDecodeError:
-            pass # Skip binary files or weird encodings
-
-    def _find_todos(self, file_path: str, lines: List[str]):
-        todo_pattern = re.compile(r'(\#|//)\s*TODO:?\s*(.*)', re.IGNORECASE)
-        beginner_keywords = ['easy', 'beginner', 'good first issue', 'simple', 'cleanup', 'doc']
-        
-        for i, line in enumerate(lines):
-            match = todo_pattern.search(line)
-            if match:
-                content = match.group(2).strip()
-                is_beginner = any(k in content.lower() for k in beginner_keywords)
-                
-                self.todos.append({
-                    'file': file_path,
-                    'line': i + 1,
-                    'content': content,
-                    'difficulty': 'Easy' if is_beginner else 'Unknown',
-                    'tags': ['good first issue'] if is_beginner else []
-                })
-
-    def _check_missing_test(self, root: str, file: str):
-        # Basic heuristic: expecting test_file.py or file_test.py in the same folder 
-        # or in a tests folder.
-        file_path = os.path.join(root, file)
-        
-        # Check file size first - if it's huge, writing tests is hard for a beginner
-        line_count = 0
+            with self._phase('scan'):
+                self._walk_and_scan(paths)
+            if self.ai_scheduler is not None:
+                with self._phase('ai.submit'):
+                    self._submit_scheduled()
+        except BaseException:
+            # Failed or interrupted (Ctrl-C): drop queued AI requests instead
+            # of waiting them out at --ai-rpm
+            if self.ai_pipeline:
+                self._cancel_ai()
+            raise
+        if self.ai_pipeline:
+            with self._phase('ai.wait'):
+                self._collect_ai_results()
+
+    def _create_scheduler(self):
+        from generator.gitfiles import GitError, churn_counts
+        from generator.scheduler import AIScheduler
+        try:
+            churn = churn_counts(self.root_path)
+        except GitError:
+            churn = {} # Not a git repo: rank without churn
+        return AIScheduler(churn=churn, **self.ai_budget)
+
+    def _walk_and_scan(self, paths: List[str] = None):
+        source_files = []
+        # Missing-test check (heuristic: only for Python files for now). Test
+        # files are indexed during the walk; the check itself runs afterwards
+        # so it can reuse line counts from the main scan.
+        untested = {}
+        self._test_files = set()
+        self._partial = paths is not None
+        with self._phase('walk'):
+            for file_path in self._candidate_paths(paths):
+                file = os.path.basename(file_path)
+                if file.endswith(SOURCE_EXTENSIONS):
+                    source_files.append(file_path)
+                    if file.endswith('.py'):
+                        if file.startswith('test_') or file.endswith('_test.py'):
+                            self._test_files.add(os.path.normpath(file_path))
+                        else:
+                            untested[file_path] = None
+
+        for result in self._analyze_files(source_files):
+            self._merge_result(result)
+            if result['file'] in untested:
+                untested[result['file']] = result['total_lines']
+
+        with self._phase('detect.missing_tests'):
+            for file_path, line_count in untested.items():
+                self._check_missing_test(file_path, line_count)
+
+        if self.cache:
+            with self._phase('cache'):
+                self.cache.save(prune=not self._partial)
+
+    def _candidate_paths(self, paths: List[str] = None):
+        if paths is None and self.enumerator != 'walk':
+            from generator.gitfiles import GitError, tracked_files
+            try:
+                paths = tracked_files(self.root_path)
+            except GitError:
+                if self.enumerator == 'git':
+                    raise
+        if paths is None:
+            for root, files in walk(self.root_path, self.excludes, self.use_gitignore):
+                for file in files:
+                    yield os.path.join(root, file)
+        else:
+            yield from filter_excluded(self.root_path, paths, self.excludes)
+
+    def _analyze_files(self, file_paths: List[str]):
+        # Results are yielded in input order so parallel runs report exactly like
+        # serial ones. Files go through in batches so only one batch of results
+        # is ever held in memory.
+        pool = None
+        if self.jobs > 1 and len(file_paths) > 1:
+            from concurrent.futures import ProcessPoolExecutor # Pulls in multiprocessing: only for -j
+            pool = ProcessPoolExecutor(max_workers=self.jobs, initializer=_init_worker,
+                                       initargs=(self.root_path, self.enable_ai, self.profiler is not None, self.detectors))
+        batch_size = ANALYSIS_BATCH * self.jobs
+        try:
+            for start in range(0, len(file_paths), batch_size):
+                yield from self._analyze_batch(file_paths[start:start + batch_size], pool)
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+
+    def _analyze_batch(self, file_paths: List[str], pool=None):
+        cached = [None] * len(file_paths)
+        if self.cache:
+            with self._phase('cache'):
+                cached = [self.cache.lookup(file_path) for file_path in file_paths]
+
+        misses = [path for path, result in zip(file_paths, cached) if result is None]
+        if pool and len(misses) > 1:
+            chunksize = max(1, min(64, len(misses) // (self.jobs * 4)))
+            fresh = pool.map(_analyze_in_worker, misses, chunksize=chunksize)
+        else:
+            fresh = map(self._analyze_file, misses)
+
+        for file_path, result in zip(file_paths, cached):
+            if result is None:
+                result = next(fresh)
+                worker_profile = result.pop('profile', None)
+                if worker_profile:
+                    self.profiler.merge(worker_profile)
+                if self.cache:
+                    self.cache.store(file_path, result)
+            yield result
+
+    def _analyze_file(self, file_path: str) -> Dict[str, Any]:
+        # Runs every per-file detector and returns a picklable result record.
+        # Must not touch the report lists: it runs inside pool workers.
+        result = {
+            'file': file_path,
+            'total_lines': None,
+            'todos': [],
+            'complex_files': [],
+            'undocumented_functions': [],
+            'security_issues': [],
+            'ai_reason': None,
+        }
+
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for _ in f:
-                    line_count += 1
-        except:
+            size = os.path.getsize(file_path)
+            if size >= MMAP_THRESHOLD:
+                # Large files: regexes run on the mapped bytes; only matched lines are decoded
+                with open(file_path, 'rb') as f:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        self._run_detectors(ParsedFile(file_path, buffer=mapped, size=size), result)
+            else:
+                with self._phase('read', size):
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        text = f.read()
+                self._run_detectors(ParsedFile(file_path, text=text, size=size), result)
+        except (UnicodeDecodeError, OSError, ValueError):
+            pass # Skip binary files, weird encodings and dangling links
+
+        return result
+
+    def _run_detectors(self, parsed: ParsedFile, result: Dict[str, Any]):
+        # Every detector reads the same ParsedFile, so each view is built at most once
+        detectors = self._detectors_for(parsed.path)
+        hits = self._detect(parsed, parsed.python)
+        for spec in detectors:
+            with self._phase(f"detector.{spec.name}", parsed.size):
+                result[spec.kind].extend(spec.load()(parsed, hits))
+        result['total_lines'] = hits.line_count
+
+        if self.enable_ai:
+            should_scan, reason = self._is_candidate_for_ai(parsed.path, hits.line_count, hits.deep_nesting, bool(hits.security), hits.security)
+            if should_scan:
+                result['ai_reason'] = reason
+
+    def _detectors_for(self, file_path: str) -> List[DetectorSpec]:
+        ext = os.path.splitext(file_path)[1]
+        detectors = self._detectors_by_ext.get(ext)
+        if detectors is None:
+            detectors = [spec for spec in self.detectors if spec.applies_to(file_path)]
+            self._detectors_by_ext[ext] = detectors
+        return detectors
+
+    def _detect(self, parsed: ParsedFile, python: bool) -> LineHits:
+        def run(engine):
+            if parsed.buffer is not None:
+                return engine.run_buffer(parsed.buffer, python, parsed.spans)
+            return engine.run_text(parsed.text, parsed.line_count, python, parsed.spans)
+
+        if not self.profiler or not self._detector_engines:
+            return run(self.engine)
+        hits = None
+        for name, engine in self._detector_engines.items():
+            with self.profiler.phase(f"detect.{name}", parsed.size):
+                part = run(engine)
+            if hits is None:
+                hits = part
+            else:
+                hits.merge(part)
+        return hits
+
+    def _merge_result(self, result: Dict[str, Any]):
+        for kind in ('todos', 'complex_files', 'undocumented_functions', 'security_issues'):
+            for item in result[kind]:
+                self._emit(kind, item)
+
+        if result['ai_reason'] and self.ai_scanner:
+            if self.ai_scheduler is not None:
+                deep_nesting = any(item['reason'] == 'Deep nesting detected' for item in result['complex_files'])
+                self.ai_scheduler.add(result['file'], result['ai_reason'], len(result['security_issues']),
+                                      deep_nesting, result['total_lines'])
+            else:
+                with self._phase('ai.submit'):
+                    self._scan_with_ai(result['file'], self._read_lines(result['file']), result['ai_reason'])
+
+    def _read_lines(self, file_path: str) -> List[str]:
+        # Re-read the file for AI; records stay small enough to ship between processes
+        with open(file_path, 'r', encoding='utf-8') as f:
+            lines = f.read().split('\n')
+        if lines[-1] == '':
+            lines.pop()
+        return lines
+
+    def _check_missing_test(self, file_path: str, line_count: int):
+        # Basic heuristic: expecting test_file.py or file_test.py in the same folder 
+        # or in a tests folder. line_count comes from the main scan (None if unreadable).
+        if line_count is None:
             return # Skip if can't read
 
+        root, file = os.path.split(file_path)
         base_name = os.path.splitext(file)[0]
         test_candidates = [f'test_{base_name}.py', f'{base_name}_test.py']
-        
-        has_test = False
-        # Check same dir
-        for cand in test_candidates:
-            if os.path.exists(os.path.join(root, cand)):
-                has_test = True
-                break
-        
-        # Check 'tests' subfolder if it didn't exist in same dir
-        if not has_test:
-             tests_path = os.path.join(self.root_path, 'tests')
-             for cand in test_candidates:
-                 if os.path.exists(os.path.join(tests_path, cand)):
-                     has_test = True
-                     break
+        tests_path = os.path.join(self.root_path, 'tests')
+
+        # Same dir first, then the top-level 'tests' folder: set lookups against the walk index.
+        # A partial scan only indexed some files, so it asks the filesystem instead.
+        has_test = any(
+            self._test_exists(os.path.normpath(os.path.join(folder, cand)))
+            for folder in (root, tests_path)
+            for cand in test_candidates
+        )
 
         if not has_test:
             # Only suggest as beginner issue if file is small
             is_beginner = line_count < 100
-            self.missing_tests.append({
+            self._emit('missing_tests', {
                 'file': file_path,
                 'difficulty': 'Easy' if is_beginner else 'Medium',
                 'tags': ['good first issue', 'testing'] if is_beginner else ['testing']
             })
 
-    def _check_complexity(self, file_path: str, line_count: int):
-        if line_count > 300:
-            self.complex_files.append({
-                'file': file_path,
-                'lines': line_count,
-                'reason': 'File too long (> 300 lines)',
-                'difficulty': 'Hard',
-                'tags': ['refactor']
-            })
+    def _test_exists(self, test_path: str) -> bool:
+        return test_path in self._test_files or (self._partial and os.path.isfile(test_path))
 
-    def _check_docs(self, file_path: str, lines: List[str]):
-        # Very simple regex-based check for missing docstrings in python functions
-        
-        for i, line in enumerate(lines):
-            if line.strip().startswith('def '):
-                func_name = line.split('def ')[1].split('(')[0]
-                if func_name.startswith('_'): # Skip private functions
-                    continue
-                    
-                # Look ahead for docstring
-                found_doc = False
-                for j in range(i + 1, len(lines)):
-                    stripped = lines[j].strip()
-                    if not stripped:
-                        continue
-                    if stripped.startswith('"""') or stripped.startswith("'''"):
-                        found_doc = True
-                    break
-                
-                if not found_doc:
-                    self.undocumented_functions.append({
-                        'file': file_path,
-                        'line': i + 1,
-                        'function': func_name,
-                        'difficulty': 'Easy',
-                        'tags': ['good first issue', 'documentation']
-                    })
-
-    def _scan_with_ai(self, file_path: str, content: str, reason: str = ""):
-        time.sleep(4) # Rate limit: 15 RPM = 1 request every 4 seconds
-        issues = self.ai_scanner.analyze_file(file_path, content, reason)
-        self.ai_issues.extend(issues)
-
-    def _check_nesting_depth(self, file_path: str, lines: List[str]) -> bool:
-        # Check for deep nesting (indentation > 16 spaces or 4 tabs approx)
-        max_depth = 0
-        for line in lines:
-            stripped = line.lstrip()
-            if not stripped or stripped.startswith('#'):
+    def _emit(self, kind: str, item: Dict[str, Any]):
+        fingerprint = self.fingerprints.assign(kind, item)
+        if fingerprint is None:
+            return
+        item = dict(item, fingerprint=fingerprint) # Records may be shared with the scan cache
+        self.counts[kind] += 1
+        for sink in self.sinks:
+            with self._phase(f"sink.{type(sink).__name__}"):
+                sink.write(kind, item)
+        if self.keep_findings:
+            getattr(self, kind).append(item)
+
+    def _scan_with_ai(self, file_path: str, lines: List[str], reason: str = ""):
+        # Non-blocking: the pipeline paces requests, results are collected after the walk
+        self._submit_ai_requests(file_path, self._plan_ai_requests(file_path, lines, reason))
+
+    def _plan_ai_requests(self, file_path: str, lines: List[str], reason: str):
+        # Big files go out as several overlapping windows (see chunker): [(chunk, label, reason)]
+        chunks = chunk_lines(lines, self.ai_chunk_chars, AI_CHUNK_OVERLAP)
+        if len(chunks) > MAX_AI_CHUNKS:
+            print(f"AI review of {file_path} stops at line {chunks[MAX_AI_CHUNKS - 1].end_line} ({len(chunks)} windows)")
+            chunks = chunks[:MAX_AI_CHUNKS]
+        if len(chunks) == 1:
+            return [(chunks[0], file_path, reason)]
+        # Distinct labels keep windows of one file apart in batched prompts
+        return [(chunk, f"{file_path}:{chunk.start_line}-{chunk.end_line}", f"{reason} (part {i + 1} of {len(chunks)})")
+                for i, chunk in enumerate(chunks)]
+
+    def _submit_ai_requests(self, file_path: str, requests):
+        parts = [(chunk, self.ai_pipeline.submit(label, chunk.content, reason)) for chunk, label, reason in requests]
+        self._ai_futures.append((file_path, parts))
+
+    def _submit_scheduled(self):
+        # Best candidates first; cached answers cost nothing against the budget
+        scheduler = self.ai_scheduler
+        scheduler.start()
+        for file_path, reason in scheduler.candidates(admit_cached=bool(self.ai_scanner.cache)):
+            try:
+                requests = self._plan_ai_requests(file_path, self._read_lines(file_path), reason)
+            except (UnicodeDecodeError, OSError):
                 continue
-            indent = len(line) - len(stripped)
-            if indent > 20: # Arbitrary threshold for "deeply nested"
-                max_depth = indent
-                
-        if max_depth > 20:
-            self.complex_files.append({
-                'file': file_path,
-                'lines': len(lines), # Approx
-                'reason': 'Deep nesting detected',
-                'difficulty': 'Hard',
-                'tags': ['refactor', 'complexity']
-            })
-            return True
-        return False
-
-    def _check_security_patterns(self, file_path: str, lines: List[str]) -> (bool, List[str]):
-        patterns = {
-            'eval_usage': r'eval\s*\(',
-            'subprocess_shell': r'subprocess\..*shell=True',
-            'hardcoded_password': r'(password|secret|key)\s*=\s*[\'"][^\'"]+[\'"]',
-            'noqa_blind': r'#\s*noqa(?!\s*:)'
-        }
-        
-        found_issues = []
-        content = "\n".join(lines)
-        
-        for name, pattern in patterns.items():
-            if re.search(pattern, content, re.IGNORECASE):
-                found_issues.append(name)
-                self.security_issues.append({
-                    'file': file_path,
-                    'issue': f"Potential security risk: {name}",
-                    'pattern': pattern,
-                    'difficulty': 'Medium',
-                    'tags': ['security', 'security-audit']
-                })
-        
-        return len(found_issues) > 0, found_issues
+            uncached = [chunk for chunk, label, chunk_reason in requests
+                        if self.ai_scanner.cached_result(label, chunk.content, chunk_reason) is None]
+            tokens = sum(self.ai_scanner.estimate_tokens(chunk.content) for chunk in uncached)
+            if scheduler.try_spend(len(uncached), tokens):
+                self._submit_ai_requests(file_path, requests)
+
+    def _collect_ai_results(self):
+        # Submission order keeps ai_issues deterministic regardless of completion order
+        from concurrent.futures import TimeoutError as FutureTimeoutError
+        try:
+            self.ai_pipeline.flush() # Don't wait out the batch linger after the walk
+            for file_path, parts in self._ai_futures:
+                answered = []
+                for chunk, future in parts:
+                    try:
+                        answered.append((chunk, future.result(timeout=self._ai_time_left())))
+                    except FutureTimeoutError:
+                        future.cancel() # Out of time budget: drop whatever is still in flight
+                        self.ai_scheduler.timed_out += 1
+                if answered:
+                    for issue in merge_chunk_issues(file_path, answered):
+                        self._emit('ai_issues', issue)
+        finally:
+            self._ai_futures = []
+            self.ai_pipeline.close()
+            self.ai_pipeline = None
+
+    def _cancel_ai(self):
+        try:
+            for _, parts in self._ai_futures:
+                for _, future in parts:
+                    future.cancel()
+        finally:
+            self._ai_futures = []
+            self.ai_pipeline.close()
+            self.ai_pipeline = None
+
+    def _ai_time_left(self):
+        return self.ai_scheduler.remaining_seconds() if self.ai_scheduler is not None else None
 
     def _is_candidate_for_ai(self, file_path: str, total_lines: int, nesting_found: bool, security_found: bool, security_reasons: List[str]) -> (bool, str):
         # Decision logic for targeted AI scan
@@ -0,0 +1,86 @@
+import heapq
+import time
+from typing import Dict, Iterator, Tuple
+
+# Score weights: a security hit outranks everything else, churn and size break ties
+SECURITY_WEIGHT = 100
+NESTING_WEIGHT = 40
+LINES_PER_POINT = 100 # One point per 100 lines...
+MAX_SIZE_POINTS = 30 # ...up to this many
+CHURN_WEIGHT = 2 # Per recent commit touching the file
+MAX_CHURN_POINTS = 40
+
+
+def score_candidate(security_hits: int, deep_nesting: bool, total_lines: int, churn: int = 0) -> float:
+    return (security_hits * SECURITY_WEIGHT
+            + (NESTING_WEIGHT if deep_nesting else 0)
+            + min(MAX_SIZE_POINTS, (total_lines or 0) / LINES_PER_POINT)
+            + min(MAX_CHURN_POINTS, churn * CHURN_WEIGHT))
+
+
+class AIScheduler:
+    """
+    Collects AI candidates during the walk and hands them out best score
+    first, while a budget of requests, estimated tokens and seconds lasts.
+    None means no limit on that dimension. Candidates that don't fit the
+    remaining requests/tokens are skipped in favour of cheaper ones further
+    down the queue.
+    """
+
+    def __init__(self, max_requests: int = None, max_tokens: int = None, max_seconds: float = None,
+                 churn: Dict[str, int] = None):
+        self.max_requests = max_requests
+        self.max_tokens = max_tokens
+        self.max_seconds = max_seconds
+        self.churn = churn or {}
+        self.requests = 0
+        self.tokens = 0
+        self.scheduled = 0
+        self.skipped = 0
+        self.timed_out = 0 # Requests still in flight at the deadline
+        self.deadline = None
+        self._heap = []
+        self._order = 0 # Ties go to the file walked first
+
+    def add(self, file_path: str, reason: str, security_hits: int, deep_nesting: bool, total_lines: int):
+        score = score_candidate(security_hits, deep_nesting, total_lines, self.churn.get(file_path, 0))
+        heapq.heappush(self._heap, (-score, self._order, file_path, reason))
+        self._order += 1
+
+    def start(self):
+        # The time budget starts when the requests do, not during the walk
+        if self.max_seconds is not None:
+            self.deadline = time.monotonic() + self.max_seconds
+
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def remaining_seconds(self):
+        return None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+
+    def candidates(self, admit_cached: bool = True) -> Iterator[Tuple[str, str]]:
+        """
+        Yields (file_path, reason), best first, until the time budget is gone.
+        Running out of requests or tokens only stops it without admit_cached:
+        otherwise fully cached files still get in through try_spend(0, 0).
+        """
+        while self._heap and not self.expired() and (admit_cached or not self.exhausted()):
+            _, _, file_path, reason = heapq.heappop(self._heap)
+            yield file_path, reason
+        self.skipped += len(self._heap)
+        self._heap = []
+
+    def exhausted(self) -> bool:
+        return ((self.max_requests is not None and self.requests >= self.max_requests)
+                or (self.max_tokens is not None and self.tokens >= self.max_tokens)
+                or self.expired())
+
+    def try_spend(self, requests: int, tokens: int) -> bool:
+        if ((self.max_requests is not None and self.requests + requests > self.max_requests)
+                or (self.max_tokens is not None and self.tokens + tokens > self.max_tokens)):
+            self.skipped += 1
+            return False
+        self.requests += requests
+        self.tokens += tokens
+        self.scheduled += 1
+        return True
@@ -0,0 +1,172 @@
+import json
+import sqlite3
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+STORE_BATCH = 1000 # Findings per insert transaction
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    root TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    findings INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS findings (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    kind TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    file TEXT NOT NULL,
+    line INTEGER,
+    summary TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+-- Index entries for equal keys are in rowid (insertion) order, so listings
+-- filtered by run, or by run and kind, need no sort
+CREATE INDEX IF NOT EXISTS findings_run ON findings(run_id);
+CREATE INDEX IF NOT EXISTS findings_fingerprint ON findings(fingerprint, run_id);
+CREATE INDEX IF NOT EXISTS findings_file ON findings(file, run_id);
+CREATE INDEX IF NOT EXISTS findings_kind ON findings(kind, run_id);
+"""
+
+# Report key -> the short text shown in query listings
+_SUMMARY = {
+    'todos': lambda item: item['content'],
+    'missing_tests': lambda item: 'Missing tests',
+    'complex_files': lambda item: item['reason'],
+    'undocumented_functions': lambda item: item['function'],
+    'security_issues': lambda item: item['issue'],
+    'ai_issues': lambda item: item.get('title', ''),
+}
+
+COUNT_COLUMNS = {'kind': 'kind', 'file': 'file', 'run': 'run_id'}
+
+
+def connect(path: str, readonly: bool = False) -> sqlite3.Connection:
+    if readonly:
+        # For queries and diffs: no WAL switch and no schema write, so a file
+        # that isn't a findings database fails here instead of becoming one
+        from urllib.parse import quote
+        conn = sqlite3.connect(f"file:{quote(path)}?mode=ro", uri=True)
+        try:
+            conn.execute('SELECT id FROM runs LIMIT 0')
+        except sqlite3.DatabaseError:
+            conn.close()
+            raise
+        return conn
+    conn = sqlite3.connect(path)
+    # WAL lets queries run while a scan is writing; NORMAL sync is safe with WAL
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+class StoreSink:
+    """
+    Records every finding of one run in a SQLite database (see connect for
+    the schema). Rows are buffered and inserted STORE_BATCH at a time, one
+    transaction per batch; the run is marked finished on a successful
+    close(), so queries for "the latest run" never see a half-written one.
+    Only full scans are recorded (main rejects --store with --since): a
+    partial run would make every finding it didn't rescan look resolved.
+    """
+
+    def __init__(self, path: str, root_path: str):
+        self.path = path
+        self.conn = connect(path)
+        with self.conn:
+            self.run_id = self.conn.execute('INSERT INTO runs (root, started_at) VALUES (?, ?)',
+                                            (root_path, time.time())).lastrowid
+        self.count = 0
+        self._rows = []
+
+    def write(self, kind: str, item: Dict[str, Any]):
+        self._rows.append((self.run_id, kind, item['fingerprint'], item['file'],
+                           item.get('line', item.get('line_number')), str(_SUMMARY[kind](item)), json.dumps(item)))
+        if len(self._rows) >= STORE_BATCH:
+            self._flush()
+
+    def _flush(self):
+        with self.conn:
+            self.conn.executemany('INSERT INTO findings VALUES (?, ?, ?, ?, ?, ?, ?)', self._rows)
+        self.count += len(self._rows)
+        self._rows = []
+
+    def close(self, success: bool = True):
+        # A failed or interrupted run keeps finished_at NULL: listed as
+        # unfinished, never picked as the latest run
+        try:
+            if success:
+                self._flush()
+                with self.conn:
+                    self.conn.execute('UPDATE runs SET finished_at = ?, findings = ? WHERE id = ?',
+                                      (time.time(), self.count, self.run_id))
+        finally:
+            self.conn.close()
+
+
+def list_runs(conn: sqlite3.Connection, limit: int = 20) -> List[Tuple]:
+    # (id, root, started_at, finished_at, findings), newest first
+    return conn.execute('SELECT id, root, started_at, finished_at, findings FROM runs ORDER BY id DESC LIMIT ?',
+                        (limit,)).fetchall()
+
+
+def latest_run(conn: sqlite3.Connection, before: int = None) -> Optional[int]:
+    # Newest finished run (older than before, if given)
+    if before is None:
+        row = conn.execute('SELECT MAX(id) FROM runs WHERE finished_at IS NOT NULL').fetchone()
+    else:
+        row = conn.execute('SELECT MAX(id) FROM runs WHERE finished_at IS NOT NULL AND id < ?', (before,)).fetchone()
+    return row[0]
+
+
+def _where(run_id: int = None, kind: str = None, file: str = None, fingerprint: str = None, new_since: int = None):
+    clauses = []
+    params = []
+    if run_id is not None:
+        clauses.append('f.run_id = ?')
+        params.append(run_id)
+    if kind:
+        clauses.append('f.kind = ?')
+        params.append(kind)
+    if file:
+        # A glob on the stored path ('*/scanner.py', 'src/*')
+        clauses.append('f.file GLOB ?')
+        params.append(file)
+    if fingerprint:
+        clauses.append('f.fingerprint = ?')
+        params.append(fingerprint)
+    if new_since is not None:
+        clauses.append('NOT EXISTS (SELECT 1 FROM findings o WHERE o.fingerprint = f.fingerprint AND o.run_id = ?)')
+        params.append(new_since)
+    return ' AND '.join(clauses) or '1', params
+
+
+def query_findings(conn: sqlite3.Connection, run_id: int, kind: str = None, file: str = None,
+                   fingerprint: str = None, new_since: int = None, limit: int = None) -> Iterator[Tuple]:
+    """
+    Findings of one run as (kind, fingerprint, file, line, summary, data),
+    optionally filtered. new_since keeps only fingerprints absent from that
+    earlier run.
+    """
+    where, params = _where(run_id, kind, file, fingerprint, new_since)
+    sql = f'SELECT f.kind, f.fingerprint, f.file, f.line, f.summary, f.data FROM findings f WHERE {where} ORDER BY f.rowid'
+    if limit is not None:
+        sql += ' LIMIT ?'
+        params.append(limit)
+    return conn.execute(sql, params)
+
+
+def count_findings(conn: sqlite3.Connection, run_id: int, group_by: str, kind: str = None, file: str = None,
+                   fingerprint: str = None, new_since: int = None, limit: int = None) -> List[Tuple[Any, int]]:
+    # (group, count), biggest first; group_by is a COUNT_COLUMNS key
+    column = COUNT_COLUMNS[group_by]
+    # Grouping by run counts across runs, so the run filter doesn't apply
+    where, params = _where(None if group_by == 'run' else run_id, kind, file, fingerprint, new_since)
+    sql = f'SELECT f.{column}, COUNT(*) AS n FROM findings f WHERE {where} GROUP BY f.{column} ORDER BY n DESC'
+    if limit is not None:
+        sql += ' LIMIT ?'
+        params.append(limit)
+    return conn.execute(sql, params).fetchall()
@@ -0,0 +1,191 @@
+import os
+import re
+from typing import Iterator, List, Sequence, Tuple
+
+# Always pruned unless overridden with a negated pattern in the exclude list
+DEFAULT_EXCLUDES = ['.git/', '__pycache__/', 'venv/', '.venv/', 'node_modules/']
+
+
+class IgnorePattern:
+    """
+    A single gitignore-style pattern, matched against '/'-separated paths
+    relative to the directory that defined it.
+    """
+
+    def __init__(self, pattern: str, base: str = ''):
+        self.base = base
+        self.negate = pattern.startswith('!')
+        if self.negate:
+            pattern = pattern[1:]
+        elif pattern.startswith('\\!') or pattern.startswith('\\#'):
+            pattern = pattern[1:]
+
+        self.dir_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+
+        # A slash anywhere but the end anchors the pattern to its base directory
+        anchored = '/' in pattern
+        pattern = pattern.lstrip('/')
+        regex = _translate(pattern)
+        if not anchored:
+            regex = '(?:.*/)?' + regex
+        self._regex = re.compile(regex + r'\Z', re.DOTALL)
+
+    def matches(self, rel_path: str, is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+        if self.base:
+            if not rel_path.startswith(self.base + '/'):
+                return False
+            rel_path = rel_path[len(self.base) + 1:]
+        return self._regex.match(rel_path) is not None
+
+
+def _translate(pattern: str) -> str:
+    # fnmatch.translate lets '*' cross '/', which gitignore does not
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == '*':
+            if pattern[i:i + 2] == '**':
+                at_start = i == 0 or pattern[i - 1] == '/'
+                at_end = i + 2 == n or pattern[i + 2] == '/'
+                if at_start and at_end:
+                    if i + 2 == n:
+                        out.append('.*') # 'foo/**': everything inside
+                    else:
+                        out.append('(?:.*/)?') # '**/foo' and 'a/**/b': zero or more directories
+                        i += 1 # Swallow the following '/'
+                    i += 2
+                    continue
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            j = pattern.find(']', i + 2 if pattern[i + 1:i + 2] in ('!', ']') else i + 1)
+            if j == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:j]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                body = body.replace('\\', '\\\\')
+                out.append(f"[{body}]")
+                i = j
+        elif c == '\\' and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+def parse_ignore_lines(lines: Sequence[str], base: str = '') -> List[IgnorePattern]:
+    patterns = []
+    for line in lines:
+        line = line.rstrip('\n').rstrip('\r')
+        if not line.endswith('\\ '):
+            line = line.rstrip(' ')
+        if not line or line.startswith('#'):
+            continue
+        patterns.append(IgnorePattern(line, base))
+    return patterns
+
+
+def _read_ignore_file(path: str, base: str) -> List[IgnorePattern]:
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return parse_ignore_lines(f.readlines(), base)
+    except OSError:
+        return []
+
+
+def _exclude_patterns(excludes: Sequence[str] = None) -> List[IgnorePattern]:
+    # User excludes come after the defaults, so '!venv/' re-includes a default
+    return parse_ignore_lines(DEFAULT_EXCLUDES + list(excludes or []))
+
+
+def is_ignored(patterns: Sequence[IgnorePattern], rel_path: str, is_dir: bool) -> bool:
+    # Last matching pattern wins, as in git
+    ignored = False
+    for pattern in patterns:
+        if pattern.negate == ignored and pattern.matches(rel_path, is_dir):
+            ignored = not pattern.negate
+    return ignored
+
+
+def walk(root_path: str, excludes: Sequence[str] = None, use_gitignore: bool = True) -> Iterator[Tuple[str, List[str]]]:
+    """
+    Yields (dirpath, filenames) like os.walk, but prunes ignored directories
+    before descending into them.
+
+    Ignore sources, lowest priority first: .git/info/exclude, .gitignore files
+    (deeper files override shallower ones), then the exclude list.
+    """
+    extra = _exclude_patterns(excludes)
+    root_rules = []
+    if use_gitignore:
+        root_rules = _read_ignore_file(os.path.join(root_path, '.git', 'info', 'exclude'), '')
+
+    # Each stack entry carries the gitignore rules inherited from its parents
+    stack = [(root_path, '', root_rules)]
+    while stack:
+        dirpath, rel_dir, inherited = stack.pop()
+        try:
+            entries = list(os.scandir(dirpath))
+        except OSError:
+            continue
+
+        rules = inherited
+        if use_gitignore and any(entry.name == '.gitignore' for entry in entries):
+            rules = inherited + _read_ignore_file(os.path.join(dirpath, '.gitignore'), rel_dir)
+        patterns = rules + extra
+
+        files = []
+        subdirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_ignored(patterns, rel_path, is_dir):
+                continue
+            if not is_dir:
+                files.append(entry.name)
+            elif not entry.is_symlink(): # Like os.walk(followlinks=False)
+                subdirs.append((entry.path, rel_path, rules))
+
+        yield dirpath, files
+        stack.extend(reversed(subdirs))
+
+
+def filter_excluded(root_path: str, paths: Sequence[str], excludes: Sequence[str] = None) -> List[str]:
+    """
+    Drops paths (under root_path) that walk() would skip because of the
+    exclude list, including files inside excluded directories. Gitignore
+    files are not consulted: callers get their lists from git, which already
+    applies them.
+    """
+    patterns = _exclude_patterns(excludes)
+    prefix = os.path.join(root_path, '')
+    excluded_dirs = {'': False} # Decided once per directory, like walk() pruning
+
+    def dir_excluded(rel_dir: str) -> bool:
+        excluded = excluded_dirs.get(rel_dir)
+        if excluded is None:
+            parent = rel_dir.rpartition('/')[0]
+            excluded = dir_excluded(parent) or is_ignored(patterns, rel_dir, True)
+            excluded_dirs[rel_dir] = excluded
+        return excluded
+
+    kept = []
+    for path in paths:
+        rel_path = path[len(prefix):] if path.startswith(prefix) else os.path.relpath(path, root_path)
+        if os.sep != '/':
+            rel_path = rel_path.replace(os.sep, '/')
+        if not dir_excluded(rel_path.rpartition('/')[0]) and not is_ignored(patterns, rel_path, False):
+            kept.append(path)
+    return kept
@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from generator.ai_cache import AIResponseCache
+
+
+def _issues(i):
+    return [{'title': f'issue {i:02d}', 'description': 'x' * 80}]
+
+
+class AIResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.size = len(json.dumps(_issues(0)).encode('utf-8'))
+        self.cache = AIResponseCache(self.tmp.name, max_bytes=self.size * 10)
+
+    def _put(self, i):
+        # Entries written in one test would share an mtime; spread them out
+        key = f'key{i:02d}'
+        self.cache.put(key, _issues(i))
+        os.utime(self.cache._path(key), (1000 + i, 1000 + i))
+        return key
+
+    def test_round_trip_and_miss(self):
+        key = self._put(1)
+        self.assertEqual(self.cache.get(key), _issues(1))
+        self.assertIsNone(self.cache.get('missing'))
+
+    def test_make_key_separates_parts(self):
+        self.assertNotEqual(AIResponseCache.make_key('ab', 'c'), AIResponseCache.make_key('a', 'bc'))
+
+    def test_least_recently_used_are_evicted_down_to_the_low_water_mark(self):
+        keys = [self._put(i) for i in range(10)]
+        self.cache.get(keys[0]) # Now the most recently used
+        self._put(10)
+        # 11 entries over a limit of 10: eviction goes down to 9, so the two oldest unused go
+        remaining = sorted(name[:-len('.json')] for name in os.listdir(self.tmp.name))
+        self.assertEqual(remaining, [keys[0]] + keys[3:] + ['key10'])
+        self.assertEqual(self.cache._total_bytes, self.size * 9)
+
+        # The freed room takes the next entry without another scan
+        with mock.patch.object(self.cache, '_evict') as evict:
+            self._put(11)
+        evict.assert_not_called()
+
+    def test_total_is_restored_from_disk(self):
+        for i in range(3):
+            self._put(i)
+        self.assertEqual(AIResponseCache(self.tmp.name)._total_bytes, self.size * 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from generator.ai_pipeline import AIPipeline
+
+
+class FakeScanner:
+    # Just enough of AIScanner for the pipeline; batch answers wait for release
+    def __init__(self):
+        self.batches = []
+        self.singles = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def cached_result(self, file_path, content, reason=""):
+        return None
+
+    def estimate_tokens(self, content):
+        return len(content) // 4 + 1
+
+    def estimate_batch_tokens(self, chars, files):
+        return chars // 4 + 10 * files
+
+    async def analyze_batch_async(self, files):
+        self.batches.append([file_path for file_path, _, _ in files])
+        self.started.set()
+        while not self.release.is_set():
+            await asyncio.sleep(0.01)
+        return {file_path: [{'title': content}] for file_path, content, _ in files}
+
+    async def analyze_file_async(self, file_path, content, reason=""):
+        self.singles.append(file_path)
+        return [{'title': content}]
+
+
+class AIPipelineTest(unittest.TestCase):
+    def setUp(self):
+        self.scanner = FakeScanner()
+        self.pipeline = AIPipeline(self.scanner, requests_per_minute=6000, batch_tokens=1000, batch_linger=60)
+
+    def tearDown(self):
+        self.scanner.release.set()
+        self.pipeline.close()
+
+    def test_files_that_fit_share_one_request(self):
+        f1 = self.pipeline.submit('a.py', 'one')
+        f2 = self.pipeline.submit('b.py', 'two')
+        self.pipeline.flush()
+        self.scanner.release.set()
+        self.assertEqual(f1.result(timeout=5), [{'title': 'one'}])
+        self.assertEqual(f2.result(timeout=5), [{'title': 'two'}])
+        self.assertEqual(self.scanner.batches, [['a.py', 'b.py']])
+        self.assertEqual(self.scanner.singles, [])
+
+    def test_cancelling_one_file_keeps_the_rest_of_the_batch(self):
+        f1 = self.pipeline.submit('a.py', 'one')
+        f2 = self.pipeline.submit('b.py', 'two')
+        self.pipeline.flush()
+        self.assertTrue(self.scanner.started.wait(5))
+        f1.cancel()
+        time.sleep(0.05) # Let the cancellation reach the loop
+        self.scanner.release.set()
+        self.assertEqual(f2.result(timeout=5), [{'title': 'two'}])
+        self.assertTrue(f1.cancelled())
+
+    def test_no_minute_goes_over_the_request_rate(self):
+        pipeline = AIPipeline(FakeScanner(), requests_per_minute=15)
+        self.addCleanup(pipeline.close)
+        bucket = pipeline.requests
+        clock = [bucket.updated]
+
+        async def sleep(seconds):
+            clock[0] += seconds
+
+        async def acquire_all():
+            times = []
+            for _ in range(45):
+                await bucket.acquire(1)
+                times.append(clock[0])
+            return times
+
+        # A fake clock, so three minutes of requests take no time (only the
+        # bucket sees it: the module's names are swapped, not the real ones)
+        with mock.patch('generator.ai_pipeline.time', SimpleNamespace(monotonic=lambda: clock[0])), \
+                mock.patch('generator.ai_pipeline.asyncio', SimpleNamespace(sleep=sleep)):
+            times = asyncio.run(acquire_all())
+        for start in times:
+            self.assertLessEqual(sum(1 for t in times if start <= t < start + 60), 15)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,27 @@
+import unittest
+
+from generator.ai_scanner import AIScanner
+
+
+class ResourceExhausted(Exception):
+    code = 429
+
+
+class HTTPError(Exception):
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class RateLimitTest(unittest.TestCase):
+    def test_matches_type_or_status_code(self):
+        self.assertTrue(AIScanner._is_rate_limit(ResourceExhausted('quota')))
+        self.assertTrue(AIScanner._is_rate_limit(HTTPError('slow down', 429)))
+
+    def test_message_text_is_ignored(self):
+        self.assertFalse(AIScanner._is_rate_limit(ValueError('bad token at line 429')))
+        self.assertFalse(AIScanner._is_rate_limit(HTTPError('429', 500)))
+
+
+if __name__ == '__main__':
+    unittest.main()
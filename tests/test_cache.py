@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+
+from generator.cache import ScanCache
+from generator.scanner import Scanner
+
+
+class ScanCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache_path = os.path.join(self.tmp.name, 'cache.json')
+        self.file = os.path.join(self.tmp.name, 'a.py')
+        self._write('x = 1\n', mtime=1000)
+
+    def _write(self, text, mtime):
+        with open(self.file, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.utime(self.file, (mtime, mtime))
+
+    def _cache(self, rules_version='v1', verify_content=False):
+        return ScanCache(self.cache_path, rules_version, verify_content=verify_content)
+
+    def _prime(self, **kwargs):
+        cache = self._cache(**kwargs)
+        self.assertIsNone(cache.lookup(self.file))
+        cache.store(self.file, {'file': self.file, 'todos': []})
+        cache.save()
+
+    def test_hit_until_the_file_changes(self):
+        self._prime()
+        self.assertEqual(self._cache().lookup(self.file), {'file': self.file, 'todos': []})
+        self._write('x = 2\n', mtime=2000)
+        self.assertIsNone(self._cache().lookup(self.file))
+
+    def test_new_rules_version_drops_everything(self):
+        self._prime()
+        self.assertIsNone(self._cache(rules_version='v2').lookup(self.file))
+
+    def test_content_hash_survives_a_touch(self):
+        self._prime(verify_content=True)
+        os.utime(self.file, (3000, 3000))
+        self.assertIsNotNone(self._cache(verify_content=True).lookup(self.file))
+        self._write('x = 3\n', mtime=3000)
+        self.assertIsNone(self._cache(verify_content=True).lookup(self.file))
+
+    def test_save_prunes_files_not_seen(self):
+        self._prime()
+        os.remove(self.file)
+        cache = self._cache()
+        self.assertIsNone(cache.lookup(self.file))
+        cache.save()
+        self.assertEqual(self._cache()._entries, {})
+
+    def test_corrupt_cache_starts_cold(self):
+        with open(self.cache_path, 'w') as f:
+            f.write('{not json')
+        self.assertIsNone(self._cache().lookup(self.file))
+
+
+class CachedScanTest(unittest.TestCase):
+    def test_warm_scan_reports_like_a_cold_one(self):
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, 'mod.py'), 'w', encoding='utf-8') as f:
+                f.write('def f():\n    # TODO: fix\n    return eval("1")\n')
+            cache_path = os.path.join(root, '.cache.json')
+            cold = Scanner(root, cache_path=cache_path)
+            cold.scan()
+            warm = Scanner(root, cache_path=cache_path)
+            warm.scan()
+            self.assertEqual((warm.cache.hits, warm.cache.misses), (1, 0))
+            self.assertEqual(warm.get_report(), cold.get_report())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+from generator.chunker import Chunk, chunk_lines, merge_chunk_issues
+
+
+class ChunkLinesTest(unittest.TestCase):
+    def test_windows_cover_the_file_with_overlap(self):
+        lines = [f"x{i} = {i}" for i in range(100)]
+        chunks = chunk_lines(lines, max_chars=200, overlap_lines=5)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(chunks[0].start_line, 1)
+        self.assertEqual(chunks[-1].end_line, 100)
+        for previous, chunk in zip(chunks, chunks[1:]):
+            self.assertEqual(chunk.start_line, previous.end_line - 5 + 1)
+        for chunk in chunks:
+            self.assertLessEqual(len(chunk.content), 200)
+            self.assertEqual(chunk.content, "\n".join(lines[chunk.start_line - 1:chunk.end_line]))
+
+    def test_cuts_before_a_def(self):
+        lines = ['a = 1'] * 30 + ['def f():'] + ['    pass'] * 30
+        chunks = chunk_lines(lines, max_chars=250, overlap_lines=0)
+        self.assertEqual(chunks[0].end_line, 30)
+        self.assertTrue(chunks[1].content.startswith('def f():'))
+
+    def test_small_file_is_one_window(self):
+        (chunk,) = chunk_lines(['a', 'b'], max_chars=1000)
+        self.assertEqual((chunk.start_line, chunk.end_line, chunk.content), (1, 2, 'a\nb'))
+
+
+class MergeChunkIssuesTest(unittest.TestCase):
+    def test_single_window_is_passed_through(self):
+        issues = [{'title': 'T', 'line_number': 3}]
+        self.assertIs(merge_chunk_issues('f.py', [(Chunk(1, 10, ''), issues)]), issues)
+
+    def test_lines_are_shifted_and_overlap_deduplicated(self):
+        first, second = Chunk(1, 50, ''), Chunk(41, 90, '')
+        merged = merge_chunk_issues('f.py', [
+            (first, [{'title': 'Bug', 'line_number': 45}, {'title': 'General', 'line_number': 0}]),
+            (second, [{'title': ' bug ', 'line_number': 5}, {'title': 'Late', 'line_number': 10}]),
+        ])
+        self.assertEqual(merged, [
+            {'title': 'Bug', 'line_number': 45, 'file': 'f.py'},
+            {'title': 'General', 'line_number': 0, 'file': 'f.py'},
+            {'title': 'Late', 'line_number': 50, 'file': 'f.py'},
+        ])
+
+    def test_line_past_the_window_is_clamped(self):
+        merged = merge_chunk_issues('f.py', [(Chunk(1, 10, ''), []), (Chunk(11, 20, ''), [{'title': 'T', 'line_number': 99}])])
+        self.assertEqual(merged[0]['line_number'], 20)
+
+    def test_non_integer_lines_are_left_alone(self):
+        merged = merge_chunk_issues('f.py', [(Chunk(1, 10, ''), []), (Chunk(11, 20, ''), [{'title': 'T', 'line_number': 'n/a'}])])
+        self.assertEqual(merged[0]['line_number'], 'n/a')
+
+
+if __name__ == '__main__':
+    unittest.main()
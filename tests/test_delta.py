@@ -0,0 +1,77 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+
+from generator import delta
+from generator.delta import diff_reports, finding, read_sorted
+from generator.fingerprint import fingerprint
+
+
+def _todo(n):
+    return {'file': f'src/m{n}.py', 'line': n, 'content': f'item {n}', 'difficulty': 'Unknown', 'tags': []}
+
+
+def _write_report(path, items):
+    with open(path, 'w', encoding='utf-8') as f:
+        for item in items:
+            item = dict(item, fingerprint=fingerprint('todos', item))
+            f.write(json.dumps(dict(item, kind='todos')) + '\n')
+
+
+class ReadSortedTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, 'report.jsonl')
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_sorted_in_memory_and_spilled_alike(self):
+        items = [_todo(n) for n in range(50)]
+        random.Random(0).shuffle(items)
+        _write_report(self.path, items)
+        in_memory = list(read_sorted(self.path))
+        with mock.patch.object(delta, 'DIFF_SORT_CHUNK', 7): # 8 spilled runs
+            spilled = list(read_sorted(self.path))
+        self.assertEqual(spilled, in_memory)
+        self.assertEqual([row[0] for row in in_memory], sorted(fingerprint('todos', item) for item in items))
+        self.assertEqual({row[1] for row in in_memory}, {'todos'})
+
+    def test_rows_round_trip(self):
+        item = dict(_todo(1), content='tab\there "quoted"')
+        _write_report(self.path, [item])
+        with mock.patch.object(delta, 'DIFF_SORT_CHUNK', 1):
+            (row,) = read_sorted(self.path)
+        self.assertEqual(finding(row), dict(item, kind='todos', fingerprint=fingerprint('todos', item)))
+
+    def test_reports_without_fingerprints(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(dict(_todo(1), kind='todos')) + '\n\n')
+        (row,) = read_sorted(self.path)
+        self.assertEqual(row[:2], (fingerprint('todos', _todo(1)), 'todos'))
+
+
+class DiffReportsTest(unittest.TestCase):
+    def test_merge_join(self):
+        old = [('a', 'todos', '{}'), ('b', 'todos', '{"old": 1}'), ('d', 'todos', '{}')]
+        new = [('b', 'todos', '{"new": 1}'), ('c', 'todos', '{}'), ('e', 'todos', '{}')]
+        self.assertEqual(list(diff_reports(iter(old), iter(new))), [
+            ('resolved', ('a', 'todos', '{}')),
+            ('unchanged', ('b', 'todos', '{"new": 1}')),
+            ('new', ('c', 'todos', '{}')),
+            ('resolved', ('d', 'todos', '{}')),
+            ('new', ('e', 'todos', '{}')),
+        ])
+
+    def test_empty_sides(self):
+        rows = [('a', 'todos', '{}')]
+        self.assertEqual(list(diff_reports(iter([]), iter(rows))), [('new', rows[0])])
+        self.assertEqual(list(diff_reports(iter(rows), iter([]))), [('resolved', rows[0])])
+        self.assertEqual(list(diff_reports(iter([]), iter([]))), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+from generator.builtin_detectors import check_docs_ast
+from generator.detectors import DetectorRegistry, DetectorSpec
+from generator.engine import LineHits
+from generator.parsed_file import ParsedFile
+
+MODULE = 'generator.builtin_detectors'
+
+
+class DetectorSpecTest(unittest.TestCase):
+    def test_extensions_must_be_single_suffixes(self):
+        DetectorSpec('ok', f'{MODULE}:find_todos', 'todos', extensions=('.py', '.tsx'))
+        for extensions in (('.d.ts',), ('py',), ('.',), ('',)):
+            with self.assertRaises(ValueError):
+                DetectorSpec('bad', f'{MODULE}:find_todos', 'todos', extensions=extensions)
+
+    def test_unknown_line_rule(self):
+        with self.assertRaises(ValueError):
+            DetectorSpec('bad', f'{MODULE}:find_todos', 'todos', line_rules=('nope',))
+
+
+class RegistrySelectTest(unittest.TestCase):
+    def test_missing_module_is_reported_at_select(self):
+        registry = DetectorRegistry()
+        registry.register(DetectorSpec('extra', 'no_such_package.detectors:check', 'todos'))
+        with self.assertRaisesRegex(ValueError, 'extra'):
+            registry.select()
+        # Disabled, it doesn't matter
+        self.assertNotIn('extra', [spec.name for spec in registry.select(disable=['extra'])])
+
+
+class DocsAstTest(unittest.TestCase):
+    def test_needs_no_line_rule(self):
+        self.assertEqual(DetectorRegistry().specs['docs_ast'].line_rules, ())
+
+    def test_parsed_file_uses_the_tree(self):
+        text = 'class A:\n    async def f(self):\n        pass\n'
+        found = check_docs_ast(ParsedFile('a.py', text=text, size=len(text)), LineHits(3))
+        self.assertEqual([item['function'] for item in found], ['A', 'f'])
+
+    def test_unparsable_file_falls_back_to_the_regex_check(self):
+        text = 'def broken(:\n    pass\n\ndef fine():\n    return 1\n'
+        found = check_docs_ast(ParsedFile('a.py', text=text, size=len(text)), LineHits(5))
+        self.assertEqual([(item['line'], item['function']) for item in found], [(1, 'broken'), (4, 'fine')])
+
+
+if __name__ == '__main__':
+    unittest.main()
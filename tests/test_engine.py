@@ -0,0 +1,70 @@
+import unittest
+from unittest import mock
+
+from generator.engine import LineEngine
+from generator.lexer import Spans
+
+PYTHON = '''s = "# TODO: in a string"  # TODO: first
+url = "http://example.com//todo"
+def documented():
+    """TODO: in a docstring"""
+    x = eval("1")  # noqa
+    msg = "eval(x)"  # eval( in a comment
+
+def undocumented(a):
+    password = "hunter2"
+'''
+JAVASCRIPT = '''const u = "http://a//TODO"; /* TODO: block */ let y = 1;
+/*
+ * TODO: continued
+ */
+const t = `// todo in a template`;
+// eval(x) in a comment
+'''
+
+
+def _run_text(engine, source, language, python):
+    return engine.run_text(source, source.count('\n'), python, Spans(source, language))
+
+
+def _run_buffer(engine, source, language, python):
+    encoded = source.encode('utf-8')
+    return engine.run_buffer(encoded, python, Spans(encoded, language))
+
+
+class LineEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = LineEngine()
+
+    def test_rules_only_count_in_their_spans(self):
+        hits = _run_text(self.engine, PYTHON, 'python', True)
+        self.assertEqual(hits.todos, [(1, 'first'), (4, 'in a docstring')])
+        self.assertEqual(hits.security, ['eval_usage', 'hardcoded_password', 'noqa_blind'])
+        self.assertEqual(hits.undocumented, [(8, 'undocumented')])
+
+        hits = _run_text(self.engine, JAVASCRIPT, 'javascript', False)
+        self.assertEqual(hits.todos, [(1, 'block'), (3, 'continued')])
+        self.assertEqual(hits.security, [])
+
+    def test_buffer_matches_text(self):
+        for source, language, python in ((PYTHON, 'python', True), (JAVASCRIPT, 'javascript', False)):
+            text_hits = _run_text(self.engine, source, language, python)
+            buffer_hits = _run_buffer(self.engine, source, language, python)
+            self.assertEqual(vars(buffer_hits), vars(text_hits))
+
+    def test_buffer_matches_text_across_windows(self):
+        # Small windows, so hits fall on both sides of many boundaries
+        source = PYTHON * 20
+        text_hits = _run_text(self.engine, source, 'python', True)
+        with mock.patch('generator.engine.WINDOW_BYTES', 100):
+            buffer_hits = _run_buffer(self.engine, source, 'python', True)
+        self.assertEqual(vars(buffer_hits), vars(text_hits))
+        self.assertEqual(text_hits.line_count, source.count('\n'))
+
+    def test_without_spans_every_match_counts(self):
+        hits = self.engine.run_text(PYTHON, PYTHON.count('\n'), True)
+        self.assertIn((1, 'in a string"  # TODO: first'), hits.todos)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from generator.fingerprint import FingerprintIndex, fingerprint
+
+
+def _todo(path, line, content, scope=''):
+    return {'file': path, 'line': line, 'content': content, 'scope': scope}
+
+
+class FingerprintTest(unittest.TestCase):
+    def test_stable_across_line_shifts_and_whitespace(self):
+        moved = fingerprint('todos', _todo('/repo/a.py', 40, 'TODO:  Fix   this', 'f'), '/repo')
+        self.assertEqual(fingerprint('todos', _todo('/repo/a.py', 3, 'todo: fix this', 'f'), '/repo'), moved)
+
+    def test_relative_to_the_root(self):
+        self.assertEqual(fingerprint('todos', _todo('/one/a.py', 1, 'x'), '/one'),
+                         fingerprint('todos', _todo('/two/a.py', 1, 'x'), '/two'))
+
+    def test_scope_kind_and_file_tell_findings_apart(self):
+        base = fingerprint('todos', _todo('a.py', 1, 'x', 'f'))
+        self.assertNotEqual(fingerprint('todos', _todo('a.py', 1, 'x', 'g')), base)
+        self.assertNotEqual(fingerprint('todos', _todo('b.py', 1, 'x', 'f')), base)
+        self.assertNotEqual(fingerprint('todos', _todo('a.py', 1, 'x', 'f'), ordinal=1), base)
+
+
+class FingerprintIndexTest(unittest.TestCase):
+    def test_identical_findings_are_numbered_and_repeats_dropped(self):
+        index = FingerprintIndex()
+        first = index.assign('todos', _todo('a.py', 1, 'x'))
+        second = index.assign('todos', _todo('a.py', 5, 'x'))
+        self.assertIsNone(index.assign('todos', _todo('a.py', 5, 'x')))
+        self.assertEqual(first, fingerprint('todos', _todo('a.py', 1, 'x')))
+        self.assertEqual(second, fingerprint('todos', _todo('a.py', 5, 'x'), ordinal=1))
+        self.assertEqual(index.duplicates, 1)
+
+    def test_ordinals_survive_a_shift_of_the_whole_file(self):
+        before, after = FingerprintIndex(), FingerprintIndex()
+        old = [before.assign('todos', _todo('a.py', line, 'x')) for line in (1, 5)]
+        new = [after.assign('todos', _todo('a.py', line + 10, 'x')) for line in (1, 5)]
+        self.assertEqual(new, old)
+
+    def test_state_is_kept_per_file(self):
+        index = FingerprintIndex()
+        for line in (1, 2, 3):
+            index.assign('todos', _todo('a.py', line, 'x'))
+        index.assign('todos', _todo('b.py', 1, 'x'))
+        self.assertEqual((len(index._seen), len(index._counts)), (1, 1))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from generator.issues import IssueWriter, generate_issue_files, render_issue
+
+
+def _todo(path, content):
+    return {'file': path, 'line': 1, 'content': content, 'difficulty': 'Easy', 'tags': [], 'fingerprint': None}
+
+
+class IssueWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.items = [_todo('a.py', 'one'), _todo('b.py', 'two')]
+
+    def _path(self, item):
+        return os.path.join(self.tmp.name, render_issue('todos', item)[0])
+
+    def test_unchanged_files_are_left_alone(self):
+        generate_issue_files({'todos': self.items}, self.tmp.name)
+        path = self._path(self.items[0])
+        os.utime(path, (1000, 1000))
+        self.items[1]['difficulty'] = 'Hard'
+        writer = generate_issue_files({'todos': self.items}, self.tmp.name)
+        self.assertEqual((writer.written, writer.unchanged), (1, 1))
+        self.assertEqual(os.path.getmtime(path), 1000)
+        with open(self._path(self.items[1]), encoding='utf-8') as f:
+            self.assertIn('**Difficulty**: Hard', f.read())
+
+    def test_repeats_are_written_once(self):
+        writer = generate_issue_files({'todos': self.items + self.items[1:]}, self.tmp.name)
+        self.assertEqual((writer.written, writer.unchanged), (2, 0))
+
+    def test_prune_removes_only_stale_issue_files(self):
+        generate_issue_files({'todos': self.items}, self.tmp.name)
+        open(os.path.join(self.tmp.name, 'README.md'), 'w').close()
+        writer = generate_issue_files({'todos': self.items[:1]}, self.tmp.name)
+        self.assertEqual(writer.removed, 1)
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), sorted(['README.md', os.path.basename(self._path(self.items[0]))]))
+
+    def test_no_prune_after_a_failed_run_or_without_prune(self):
+        generate_issue_files({'todos': self.items}, self.tmp.name)
+        writer = IssueWriter(self.tmp.name)
+        writer.write('todos', self.items[0])
+        writer.close(success=False)
+        generate_issue_files({'todos': []}, self.tmp.name, prune=False)
+        self.assertEqual(len(os.listdir(self.tmp.name)), 2)
+
+    def test_prune_with_spilled_name_runs(self):
+        items = [_todo(f'f{i}.py', f'todo {i}') for i in range(25)]
+        stale = ['issue_todo_0000000000000000.md', 'issue_todo_ffffffffffffffff.md']
+        for name in stale:
+            open(os.path.join(self.tmp.name, name), 'w').close()
+        with mock.patch('generator.issues.PRUNE_SORT_CHUNK', 4):
+            writer = IssueWriter(self.tmp.name)
+            for item in items:
+                writer.write('todos', item)
+            writer.close()
+        expected = sorted(render_issue('todos', item)[0] for item in items)
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), expected)
+        self.assertEqual((writer.written, writer.removed), (25, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+
+from generator.lexer import CODE, COMMENT, DOCSTRING, STRING, Spans, language_for
+
+
+def _kinds(source, language):
+    # [(kind, text)] of every non-code span
+    spans = Spans(source, language)
+    return [(spans.kind_at(start), source[start:end]) for start, end in spans.spans()]
+
+
+class LexerTest(unittest.TestCase):
+    def test_python(self):
+        source = ('x = "# not a comment"  # real\n'
+                  'def f():\n'
+                  '    """Doc # not a comment"""\n'
+                  "    y = 'it\\'s' + r\"\\d\"\n"
+                  '    z = """multi\n'
+                  '    line"""\n')
+        self.assertEqual(_kinds(source, 'python'), [
+            (STRING, '"# not a comment"'),
+            (COMMENT, '# real'),
+            (DOCSTRING, '"""Doc # not a comment"""'),
+            (STRING, "'it\\'s'"),
+            (STRING, '"\\d"'),
+            (STRING, '"""multi\n    line"""'),
+        ])
+
+    def test_unterminated_string_ends_at_newline(self):
+        source = 'x = "open\n# comment\n'
+        self.assertEqual(_kinds(source, 'python'), [(STRING, '"open'), (COMMENT, '# comment')])
+
+    def test_javascript(self):
+        source = 'a = `t ${x} // no`; /* TODO\n * more */ b = "//x"; // c\n'
+        self.assertEqual(_kinds(source, 'javascript'), [
+            (STRING, '`t ${x} // no`'),
+            (COMMENT, '/* TODO\n * more */'),
+            (STRING, '"//x"'),
+            (COMMENT, '// c'),
+        ])
+
+    def test_c_and_java(self):
+        source = "char c = '\"'; /* a ** b **/ s = \"/* no */\";\n"
+        self.assertEqual(_kinds(source, 'c'), [(STRING, "'\"'"), (COMMENT, '/* a ** b **/'), (STRING, '"/* no */"')])
+        self.assertEqual(_kinds('s = """\n// text block\n""";', 'java'), [(STRING, '"""\n// text block\n"""')])
+
+    def test_unterminated_block_comment_runs_to_end(self):
+        self.assertEqual(_kinds('x; /* open\nstill', 'c'), [(COMMENT, '/* open\nstill')])
+
+    def test_span_at(self):
+        source = 'x = 1  # note\ny = 2\n'
+        spans = Spans(source, 'python')
+        self.assertEqual(spans.span_at(0), (CODE, None))
+        self.assertEqual(spans.span_at(source.index('note')), (COMMENT, source.index('\n')))
+        self.assertEqual(spans.kind_at(source.index('y')), CODE)
+
+    def test_bytes_give_the_same_spans(self):
+        source = 'é = "ü"  # ß\n"""Doc"""\n'
+        encoded = source.encode('utf-8')
+        text_spans = [(source[:start].encode('utf-8').__len__(), source[:end].encode('utf-8').__len__())
+                      for start, end in Spans(source, 'python').spans()]
+        self.assertEqual(Spans(encoded, 'python').spans(), text_spans)
+        self.assertEqual(Spans(encoded, 'python').kind_at(encoded.index(b'Doc')), DOCSTRING)
+
+    def test_language_for(self):
+        self.assertEqual(language_for('a/b.py'), 'python')
+        self.assertEqual(language_for('x.tsx'), 'javascript')
+        self.assertEqual(language_for('x.h'), 'c')
+        self.assertIsNone(language_for('x.rb'))
+
+
+if __name__ == '__main__':
+    unittest.main()
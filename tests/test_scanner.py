@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+
+from generator.scanner import Scanner
+
+SOURCE = '''import os
+
+def handler_{i}(path):
+    # TODO: validate path {i}
+    return eval(path)
+
+def helper_{i}():
+    """Documented."""
+    password = "secret{i}"
+'''
+
+
+def _make_tree(root, count):
+    for i in range(count):
+        directory = os.path.join(root, f'pkg{i % 4}')
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f'mod{i}.py'), 'w', encoding='utf-8') as f:
+            f.write(SOURCE.format(i=i))
+        if i % 3 == 0:
+            with open(os.path.join(directory, f'test_mod{i}.py'), 'w', encoding='utf-8') as f:
+                f.write('def test_it():\n    pass\n')
+    with open(os.path.join(root, 'app.js'), 'w', encoding='utf-8') as f:
+        f.write('// TODO: split this file\n' + 'let x = 1;\n' * 400)
+
+
+class ParallelScanTest(unittest.TestCase):
+    def test_parallel_report_matches_serial(self):
+        with tempfile.TemporaryDirectory() as root:
+            _make_tree(root, 40)
+            serial = Scanner(root, jobs=1)
+            serial.scan()
+            parallel = Scanner(root, jobs=3)
+            parallel._analyze_file = lambda file_path: self.fail('analyzed outside the pool')
+            parallel.scan()
+            report = serial.get_report()
+            self.assertEqual(len(report['todos']), 41)
+            self.assertEqual(parallel.get_report(), report)
+
+
+if __name__ == '__main__':
+    unittest.main()
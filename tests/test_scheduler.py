@@ -0,0 +1,60 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from generator.scheduler import AIScheduler
+
+
+def _scheduler(**budget):
+    scheduler = AIScheduler(**budget)
+    scheduler.add('low.py', 'size', 0, False, 100)
+    scheduler.add('high.py', 'security', 2, False, 100)
+    scheduler.add('mid.py', 'nesting', 0, True, 100)
+    return scheduler
+
+
+class AISchedulerTest(unittest.TestCase):
+    def test_best_score_first(self):
+        scheduler = _scheduler()
+        scheduler.start()
+        self.assertEqual([path for path, _ in scheduler.candidates()], ['high.py', 'mid.py', 'low.py'])
+
+    def test_cached_files_get_in_after_the_budget_is_spent(self):
+        scheduler = _scheduler(max_requests=1)
+        scheduler.start()
+        admitted = []
+        for path, _ in scheduler.candidates():
+            # Only mid.py has no cached answer
+            if scheduler.try_spend(1 if path == 'mid.py' else 0, 0):
+                admitted.append(path)
+        self.assertEqual(admitted, ['high.py', 'mid.py', 'low.py'])
+        self.assertTrue(scheduler.exhausted())
+        self.assertEqual((scheduler.scheduled, scheduler.skipped), (3, 0))
+
+    def test_requests_that_dont_fit_are_skipped(self):
+        scheduler = _scheduler(max_tokens=100)
+        scheduler.start()
+        admitted = [path for path, _ in scheduler.candidates() if scheduler.try_spend(1, 60)]
+        self.assertEqual(admitted, ['high.py'])
+        self.assertEqual((scheduler.scheduled, scheduler.skipped), (1, 2))
+
+    def test_without_admit_cached_stops_when_spent(self):
+        scheduler = _scheduler(max_requests=1)
+        scheduler.start()
+        admitted = [path for path, _ in scheduler.candidates(admit_cached=False) if scheduler.try_spend(1, 0)]
+        self.assertEqual(admitted, ['high.py'])
+        self.assertEqual(scheduler.skipped, 2)
+
+    def test_time_budget_stops_the_queue(self):
+        scheduler = _scheduler(max_seconds=10)
+        with mock.patch('generator.scheduler.time', SimpleNamespace(monotonic=lambda: 100.0)):
+            scheduler.start()
+            candidates = scheduler.candidates()
+            self.assertEqual(next(candidates)[0], 'high.py')
+        with mock.patch('generator.scheduler.time', SimpleNamespace(monotonic=lambda: 110.0)):
+            self.assertEqual(list(candidates), [])
+        self.assertEqual(scheduler.skipped, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
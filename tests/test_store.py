@@ -0,0 +1,61 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from generator.store import StoreSink, connect, count_findings, latest_run, query_findings
+
+
+def _todo(path, content, fingerprint):
+    return {'file': path, 'line': 1, 'content': content, 'fingerprint': fingerprint}
+
+
+class StoreTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, 'findings.db')
+
+    def _record(self, items, success=True):
+        sink = StoreSink(self.path, '/repo')
+        for item in items:
+            sink.write('todos', item)
+        sink.close(success)
+        return sink.run_id
+
+    def test_runs_and_new_findings(self):
+        first = self._record([_todo('a.py', 'one', 'f1'), _todo('b.py', 'two', 'f2')])
+        second = self._record([_todo('a.py', 'one', 'f1'), _todo('c.py', 'three', 'f3')])
+        conn = connect(self.path, readonly=True)
+        self.addCleanup(conn.close)
+        self.assertEqual(latest_run(conn), second)
+        self.assertEqual(latest_run(conn, before=second), first)
+        new = [row[1] for row in query_findings(conn, second, new_since=first)]
+        self.assertEqual(new, ['f3'])
+        self.assertEqual([row[2] for row in query_findings(conn, second, file='c*')], ['c.py'])
+        self.assertEqual(count_findings(conn, second, 'kind'), [('todos', 2)])
+
+    def test_failed_run_is_never_the_latest(self):
+        first = self._record([_todo('a.py', 'one', 'f1')])
+        self._record([_todo('a.py', 'one', 'f1')], success=False)
+        conn = connect(self.path, readonly=True)
+        self.addCleanup(conn.close)
+        self.assertEqual(latest_run(conn), first)
+
+    def test_readonly_connect_does_not_write(self):
+        with open(self.path, 'w') as f:
+            f.write('{"kind": "todos"}\n')
+        with self.assertRaises(sqlite3.DatabaseError):
+            connect(self.path, readonly=True)
+        with open(self.path) as f:
+            self.assertEqual(f.read(), '{"kind": "todos"}\n')
+
+        empty = os.path.join(self.tmp.name, 'empty.db')
+        sqlite3.connect(empty).close()
+        with self.assertRaises(sqlite3.DatabaseError):
+            connect(empty, readonly=True)
+        self.assertEqual(os.path.getsize(empty), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
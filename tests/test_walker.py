@@ -0,0 +1,124 @@
+import os
+import tempfile
+import unittest
+
+from generator.walker import IgnorePattern, filter_excluded, is_ignored, parse_ignore_lines, walk
+
+
+def _tree(root, paths):
+    for path in paths:
+        full = os.path.join(root, path)
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, 'w', encoding='utf-8') as f:
+            f.write(paths[path] if isinstance(paths, dict) else '')
+
+
+def _walked(root, **kwargs):
+    found = []
+    for dirpath, files in walk(root, **kwargs):
+        rel_dir = os.path.relpath(dirpath, root)
+        found.extend(os.path.normpath(os.path.join(rel_dir, file)).replace(os.sep, '/') for file in files)
+    return sorted(found)
+
+
+class IgnorePatternTest(unittest.TestCase):
+    def assertMatches(self, pattern, path, is_dir=False, base=''):
+        self.assertTrue(IgnorePattern(pattern, base).matches(path, is_dir), f"{pattern!r} should match {path!r}")
+
+    def assertNotMatches(self, pattern, path, is_dir=False, base=''):
+        self.assertFalse(IgnorePattern(pattern, base).matches(path, is_dir), f"{pattern!r} should not match {path!r}")
+
+    def test_unanchored_matches_at_any_depth(self):
+        self.assertMatches('*.log', 'debug.log')
+        self.assertMatches('*.log', 'a/b/debug.log')
+        self.assertNotMatches('*.log', 'debug.log.txt')
+
+    def test_star_does_not_cross_slash(self):
+        self.assertMatches('src/*.py', 'src/a.py')
+        self.assertNotMatches('src/*.py', 'src/sub/a.py')
+
+    def test_slash_anchors_to_base(self):
+        self.assertMatches('/build', 'build', is_dir=True)
+        self.assertNotMatches('/build', 'sub/build', is_dir=True)
+        self.assertMatches('docs/out', 'docs/out', is_dir=True)
+        self.assertNotMatches('docs/out', 'x/docs/out', is_dir=True)
+
+    def test_trailing_slash_only_matches_directories(self):
+        self.assertMatches('build/', 'build', is_dir=True)
+        self.assertNotMatches('build/', 'build')
+
+    def test_double_star(self):
+        self.assertMatches('**/foo', 'foo')
+        self.assertMatches('**/foo', 'a/b/foo')
+        self.assertMatches('a/**/b', 'a/b')
+        self.assertMatches('a/**/b', 'a/x/y/b')
+        self.assertMatches('a/**', 'a/x/y')
+        self.assertNotMatches('a/**', 'b/x')
+
+    def test_character_classes_and_escapes(self):
+        self.assertMatches('[!a]bc', 'xbc')
+        self.assertNotMatches('[!a]bc', 'abc')
+        self.assertMatches('file?.txt', 'file1.txt')
+        self.assertNotMatches('file?.txt', 'file/.txt')
+        self.assertMatches('\\#notes', '#notes')
+        self.assertMatches('\\!important', '!important')
+
+    def test_base_directory(self):
+        self.assertMatches('*.tmp', 'sub/x.tmp', base='sub')
+        self.assertNotMatches('*.tmp', 'other/x.tmp', base='sub')
+
+    def test_last_match_wins(self):
+        patterns = parse_ignore_lines(['*.log', '!keep.log', '# comment', ''])
+        self.assertEqual(len(patterns), 2)
+        self.assertTrue(is_ignored(patterns, 'a.log', False))
+        self.assertFalse(is_ignored(patterns, 'keep.log', False))
+
+
+class WalkTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+        _tree(self.root, {
+            '.gitignore': '*.log\nbuild/\n',
+            'a.py': '',
+            'debug.log': '',
+            'build/out.py': '',
+            'pkg/.gitignore': '!special.log\n/local.py\n',
+            'pkg/special.log': '',
+            'pkg/local.py': '',
+            'pkg/deep/local.py': '',
+            'venv/lib.py': '',
+            'node_modules/m.js': '',
+            'dist/bundle.js': '',
+        })
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_gitignore_and_default_excludes(self):
+        self.assertEqual(_walked(self.root), ['.gitignore', 'a.py', 'dist/bundle.js', 'pkg/.gitignore',
+                                              'pkg/deep/local.py', 'pkg/special.log'])
+
+    def test_user_excludes_keep_the_defaults(self):
+        found = _walked(self.root, excludes=['dist/'])
+        self.assertNotIn('dist/bundle.js', found)
+        self.assertNotIn('venv/lib.py', found)
+        self.assertNotIn('node_modules/m.js', found)
+
+    def test_negated_exclude_reincludes_a_default(self):
+        self.assertIn('venv/lib.py', _walked(self.root, excludes=['!venv/']))
+
+    def test_without_gitignore(self):
+        found = _walked(self.root, use_gitignore=False)
+        self.assertIn('debug.log', found)
+        self.assertIn('build/out.py', found)
+        self.assertNotIn('venv/lib.py', found)
+
+    def test_filter_excluded_matches_walk(self):
+        paths = [os.path.join(self.root, path) for path in ('a.py', 'venv/lib.py', 'dist/bundle.js', 'pkg/local.py')]
+        kept = filter_excluded(self.root, paths, excludes=['dist/'])
+        self.assertEqual([os.path.relpath(path, self.root) for path in kept], ['a.py', os.path.join('pkg', 'local.py')])
+
+
+if __name__ == '__main__':
+    unittest.main()